@@ -10,6 +10,7 @@ import os
 import serial
 import serial.tools.list_ports
 import time
+from itertools import chain
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any, Tuple
 
@@ -33,12 +34,8 @@ def build_adalight_frame(pixels: List[Tuple[int, int, int]]) -> bytes:
         (count_minus_one >> 8) ^ (count_minus_one & 0xFF) ^ 0x55
     ])
     
-    # Build pixel data (RGB)
-    data = bytearray()
-    for r, g, b in pixels:
-        data.append(r & 0xFF)
-        data.append(g & 0xFF)
-        data.append(b & 0xFF)
+    # Build pixel data (RGB) - tuples are flattened in C, values must be 0-255
+    data = bytes(chain.from_iterable(pixels))
     
     return bytes(header + data)
 
@@ -62,12 +59,8 @@ def build_awa_frame(pixels: List[Tuple[int, int, int]]) -> bytes:
         crc
     ])
     
-    # Build pixel data (RGB)
-    data = bytearray()
-    for r, g, b in pixels:
-        data.append(r & 0xFF)
-        data.append(g & 0xFF)
-        data.append(b & 0xFF)
+    # Build pixel data (RGB) - tuples are flattened in C, values must be 0-255
+    data = bytes(chain.from_iterable(pixels))
     
     # Calculate Fletcher checksums
     fletcher1 = 0
@@ -13,6 +13,9 @@ import socket
 import struct
 import threading
 import signal
+from itertools import accumulate
+from functools import lru_cache
+from operator import sub
 from typing import Dict, Any, Optional, Tuple
 from queue import Queue, Empty, Full
 from datetime import datetime
@@ -30,6 +33,20 @@ WLED_BAUD_RATES = [
     2000000,
 ]
 
+# OPC header: channel (1 byte), command (1 byte), length (2 bytes, big-endian)
+_OPC_HEADER = struct.Struct('>BBH')
+
+
+@lru_cache(maxsize=8)
+def _fletcher_ext_mask(length: int) -> Tuple[int, int]:
+    """
+    Positional XOR mask for the AWA fletcher_ext checksum, cached per frame length
+    For byte < 256: byte ^ position == (byte ^ (position & 0xFF)) + (position & ~0xFF),
+    so returns (the low position bytes as one little-endian int, sum of the high bits)
+    """
+    low = (bytes(range(256)) * (length // 256 + 1))[:length]
+    return int.from_bytes(low, 'little'), sum(p & ~0xFF for p in range(length))
+
 
 class LEDOutput:
     """Handles serial output to LED strips with dedicated worker thread"""
@@ -74,6 +91,8 @@ class LEDOutput:
                 self.ser = self._open_standard_port(self.baud_rate)
             
             if self.ser:
+                if self.protocol == 'awa':
+                    _fletcher_ext_mask(self.led_count * self.stride)  # Build the checksum mask up front
                 return True
             return False
         except serial.SerialException as e:
@@ -290,6 +309,8 @@ class LEDOutput:
             self.worker_thread.join(timeout=1.0)
         if self.ser:
             try:
+                # Let the last frame drain before closing
+                self.ser.flush()
                 self.ser.close()
             except Exception:
                 # Port may already be disconnected - ignore errors during close
@@ -361,47 +382,44 @@ class LEDOutput:
             return pixel_data
         
         pixel_count = len(pixel_data) // 3
+        end = pixel_count * 3  # Ignore any trailing partial pixel
+        
+        # Channel shuffles use extended slices so the per-byte work runs in C
         
         # For same-size 3-channel transforms, transform in-place
         if self.pixel_format == 'GRB':
             # Swap R and G channels in place
-            for i in range(pixel_count):
-                idx = i * 3
-                pixel_data[idx], pixel_data[idx + 1] = pixel_data[idx + 1], pixel_data[idx]
+            pixel_data[0:end:3], pixel_data[1:end:3] = pixel_data[1:end:3], pixel_data[0:end:3]
             return pixel_data
         
         elif self.pixel_format == 'BGR':
             # Reverse RGB to BGR in place
-            for i in range(pixel_count):
-                idx = i * 3
-                pixel_data[idx], pixel_data[idx + 2] = pixel_data[idx + 2], pixel_data[idx]
+            pixel_data[0:end:3], pixel_data[2:end:3] = pixel_data[2:end:3], pixel_data[0:end:3]
             return pixel_data
         
         # RGBW transforms - different size output
         elif self.pixel_format in ('RGBW', 'GRBW'):
+            r = pixel_data[0:end:3]
+            g = pixel_data[1:end:3]
+            b = pixel_data[2:end:3]
+            
+            # Extract white channel and subtract from RGB
+            # (inline compare is ~3x faster than calling min() per pixel)
+            w = bytes([x if x < y and x < z else (y if y < z else z) for x, y, z in zip(r, g, b)])
+            r = bytes(map(sub, r, w))
+            g = bytes(map(sub, g, w))
+            b = bytes(map(sub, b, w))
+            
             # Create new buffer with stride 4
             transformed = bytearray(pixel_count * 4)
-            
-            for i in range(pixel_count):
-                src_idx = i * 3
-                dst_idx = i * 4
-                r = pixel_data[src_idx]
-                g = pixel_data[src_idx + 1]
-                b = pixel_data[src_idx + 2]
-                
-                # Extract white channel and subtract from RGB
-                w = min(r, g, b)
-                
-                if self.pixel_format == 'RGBW':
-                    transformed[dst_idx] = r - w
-                    transformed[dst_idx + 1] = g - w
-                    transformed[dst_idx + 2] = b - w
-                    transformed[dst_idx + 3] = w
-                else:  # GRBW
-                    transformed[dst_idx] = g - w
-                    transformed[dst_idx + 1] = r - w
-                    transformed[dst_idx + 2] = b - w
-                    transformed[dst_idx + 3] = w
+            if self.pixel_format == 'RGBW':
+                transformed[0::4] = r
+                transformed[1::4] = g
+            else:  # GRBW
+                transformed[0::4] = g
+                transformed[1::4] = r
+            transformed[2::4] = b
+            transformed[3::4] = w
             
             return transformed
         
@@ -467,15 +485,15 @@ class LEDOutput:
             print(f"[{ts}] [SERIAL-WRITE] Frame checksum: 0x{sum(frame) & 0xFF:02X}")
         
         # Send frame: header + pixel data (may raise SerialException)
+        # No flush() here - it blocks until the UART drains; the next write just queues behind
         bytes_written = self.ser.write(frame)
-        self.ser.flush()
         
         if self.ddebug:
             ts = datetime.now().strftime('%H:%M:%S.%f')[:-3]
             if bytes_written != len(frame):
                 print(f"[{ts}] [SERIAL-ERROR] Partial write! Expected {len(frame)}, wrote {bytes_written}")
             else:
-                print(f"[{ts}] [SERIAL-WRITE] Successfully wrote all {bytes_written} bytes and flushed")
+                print(f"[{ts}] [SERIAL-WRITE] Successfully wrote all {bytes_written} bytes")
     
     def _send_awa_frame(self, pixel_data: bytearray):
         """Send AWA protocol frame (HyperSerialPico format, may raise SerialException)"""
@@ -494,16 +512,15 @@ class LEDOutput:
         ])
         
         # Calculate Fletcher checksums (matches HyperSerialPico implementation)
-        fletcher1 = 0
-        fletcher2 = 0
-        fletcher_ext = 0
-        position = 0
-        
-        for byte in pixel_data:
-            fletcher1 = (fletcher1 + byte) % 255
-            fletcher2 = (fletcher2 + fletcher1) % 255
-            fletcher_ext = (fletcher_ext + (byte ^ position)) % 255
-            position += 1
+        # The reference loop reduces mod 255 every byte; since the sums are linear the
+        # reduction can happen once at the end, which lets the loops run in C:
+        #   fletcher1    = sum(byte)
+        #   fletcher2    = sum of the running fletcher1 values (prefix sums)
+        #   fletcher_ext = sum(byte ^ position), XORed as one big int against a cached mask
+        fletcher1 = sum(pixel_data) % 255
+        fletcher2 = sum(accumulate(pixel_data)) % 255
+        mask, high = _fletcher_ext_mask(len(pixel_data))
+        fletcher_ext = (sum((int.from_bytes(pixel_data, 'little') ^ mask).to_bytes(len(pixel_data), 'little')) + high) % 255
         
         # Special case: if fletcher_ext is 0x41 ('A'), use 0xaa instead
         if fletcher_ext == 0x41:
@@ -520,16 +537,21 @@ class LEDOutput:
             hex_dump = ' '.join(f'{b:02x}' for b in frame)
             print(f"[SERIAL] Raw output: {hex_dump}")
         
-        # Send frame: header + data + fletcher checksums
+        # Send frame: header + data + fletcher checksums (no per-frame flush, see Adalight)
         self.ser.write(frame)
-        self.ser.flush()
 
 
 class OPCServer:
     """OPC Server that receives OPC data and outputs to serial"""
     
-    # Receive buffer size (supports large frames)
-    RECV_BUFFER_SIZE = 16384  # 16KB
+    # Receive buffer size - holds two maximum-size OPC messages (4 + 65535 bytes each)
+    RECV_BUFFER_SIZE = 131072  # 128KB
+    
+    # Move unparsed bytes back to the start of the buffer once the head passes this point
+    RECV_COMPACT_THRESHOLD = RECV_BUFFER_SIZE // 2
+    
+    # Kernel socket receive buffer - absorbs bursts while outputs are busy
+    SOCKET_RECV_BUFFER_SIZE = 1 << 20  # 1MB
     
     def __init__(self, config: Dict[str, Any], debug: bool = False, ddebug: bool = False):
         self.config = config
@@ -538,6 +560,7 @@ class OPCServer:
         self.host = config['opc']['host']
         self.port = config['opc']['port']
         self.outputs = []
+        self._by_channel = {}  # opc_channel -> list of outputs, built in setup_outputs
         self.running = False
         self.server_socket = None
         
@@ -561,6 +584,11 @@ class OPCServer:
             print("Error: No outputs could be opened")
             return False
         
+        # Index outputs by OPC channel so each message is a single dict lookup
+        self._by_channel = {}
+        for output in self.outputs:
+            self._by_channel.setdefault(output.opc_channel, []).append(output)
+        
         return True
     
     def start(self):
@@ -574,6 +602,8 @@ class OPCServer:
         try:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Set before listen() so accepted connections inherit it (and its TCP window)
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.SOCKET_RECV_BUFFER_SIZE)
             self.server_socket.bind((self.host, self.port))
             self.server_socket.listen(1)
             print(f"✓ OPC Server listening on {self.host}:{self.port}")
@@ -648,17 +678,31 @@ class OPCServer:
         """Handle OPC client connection with non-blocking TCP drain"""
         # Set socket to non-blocking mode
         client_socket.setblocking(False)
-        buffer = b''
+        
+        # Preallocated receive buffer: recv_into writes straight into it, and
+        # messages are parsed in place by advancing head instead of re-slicing
+        buffer = bytearray(self.RECV_BUFFER_SIZE)
+        buffer_view = memoryview(buffer)
+        head = 0  # Start of unparsed data
+        tail = 0  # End of received data
         
         while self.running:
             # Drain TCP socket (read all available data)
             while True:
+                if tail == len(buffer):
+                    if head == 0:
+                        # Buffer full of unparsed messages - parse before reading more
+                        break
+                    # Move the unparsed remainder to the front to make room
+                    buffer[:tail - head] = buffer[head:tail]
+                    tail -= head
+                    head = 0
                 try:
-                    data = client_socket.recv(self.RECV_BUFFER_SIZE)
-                    if not data:
+                    received = client_socket.recv_into(buffer_view[tail:])
+                    if not received:
                         # Connection closed
                         return
-                    buffer += data
+                    tail += received
                 except BlockingIOError:
                     # No more data available right now
                     break
@@ -668,26 +712,32 @@ class OPCServer:
                     return
             
             # Process complete OPC messages in buffer
-            while len(buffer) >= 4:
-                # OPC header: channel (1 byte), command (1 byte), length (2 bytes, big-endian)
-                channel = buffer[0]
-                command = buffer[1]
-                length = struct.unpack('>H', buffer[2:4])[0]
+            while tail - head >= _OPC_HEADER.size:
+                # Parse header in place (no slice, format compiled once)
+                channel, command, length = _OPC_HEADER.unpack_from(buffer, head)
                 
                 # Check if we have the complete message
-                message_size = 4 + length
-                if len(buffer) < message_size:
+                message_end = head + _OPC_HEADER.size + length
+                if tail < message_end:
                     break
                 
                 # Extract message data as bytearray
-                message_data = bytearray(buffer[4:message_size])
-                buffer = buffer[message_size:]
+                message_data = buffer[head + _OPC_HEADER.size:message_end]
+                head = message_end
                 
                 # Process OPC message
                 if command == 0:  # Set pixel colors
                     self._process_pixel_data(channel, message_data)
                     self.frames_received += 1
             
+            # Reset or compact so the buffer never runs out of room
+            if head == tail:
+                head = tail = 0
+            elif head > self.RECV_COMPACT_THRESHOLD:
+                buffer[:tail - head] = buffer[head:tail]
+                tail -= head
+                head = 0
+            
             # Small sleep to avoid busy loop (1ms)
             time.sleep(0.001)
     
@@ -705,15 +755,9 @@ class OPCServer:
             print(f"[{ts}] [DEBUG] First 30 bytes received: {hex_dump}")
         
         # Distribute to each serial output listening to this channel
-        for output in self.outputs:
-            # Does this output listen to this channel?
-            # Broadcast (channel 0) goes to outputs configured for channel 0
-            # Other channels go to matching outputs
-            if output.opc_channel != channel:
-                # Skip if not the right channel
-                if not (channel == 0 and output.opc_channel == 0):
-                    continue
-            
+        # Broadcast (channel 0) goes to outputs configured for channel 0
+        # Other channels go to matching outputs
+        for output in self._by_channel.get(channel, ()):
             # Calculate byte offset and length for this output
             offset_bytes = output.opc_offset * 3  # RGB stride
             needed_bytes = output.led_count * 3
@@ -6,26 +6,36 @@ Sends test patterns to OPC server for validation
 
 import socket
 import struct
+import os
 import time
 import argparse
-import colorsys
 import signal
 import sys
+from itertools import chain
 
 
 class OPCClient:
     """OPC client with persistent connection"""
     
-    def __init__(self, host, port):
+    # Socket send buffer - room for bursts of frames without blocking sendall
+    SEND_BUFFER_SIZE = 1 << 20  # 1MB
+    
+    def __init__(self, host, port, nodelay=True):
         self.host = host
         self.port = port
+        self.nodelay = nodelay
         self.sock = None
+        self._message = bytearray()  # Reused OPC message buffer (header + pixel data)
     
     def connect(self):
         """Connect to OPC server"""
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.SEND_BUFFER_SIZE)
             self.sock.connect((self.host, self.port))
+            # Frames are small and latency-sensitive - don't let Nagle hold them back
+            if self.nodelay:
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             return True
         except Exception as e:
             print(f"Error connecting: {e}")
@@ -43,20 +53,27 @@ class OPCClient:
     def send_frame(self, channel, pixels, debug=False):
         """
         Send OPC frame to server
-        pixels: list of (r, g, b) tuples
+        pixels: list of (r, g, b) tuples, or flat RGB bytes (sent as-is)
         Returns: True on success, False on failure
         """
-        # Build pixel data
-        data = bytearray()
-        for r, g, b in pixels:
-            data.extend([r & 0xFF, g & 0xFF, b & 0xFF])
+        # Build pixel data (tuples are flattened in C, values must be 0-255)
+        if isinstance(pixels, (bytes, bytearray)):
+            data = pixels
+        else:
+            data = bytes(chain.from_iterable(pixels))
         
-        # Build OPC message: channel, command(0), length(2 bytes BE), data
-        message = struct.pack('>BBH', channel, 0, len(data)) + data
+        # Build OPC message in one contiguous buffer so it goes out as a single send:
+        # channel, command(0), length(2 bytes BE), data
+        message_size = 4 + len(data)
+        if len(self._message) != message_size:
+            self._message = bytearray(message_size)
+        message = self._message
+        struct.pack_into('>BBH', message, 0, channel, 0, len(data))
+        message[4:] = data
         
         if debug:
-            print(f"[DEBUG] Sending: channel={channel}, pixel_count={len(pixels)}, byte_count={len(data)}, "
-                  f"message_size={len(message)}, first_pixel={pixels[0] if pixels else None}")
+            print(f"[DEBUG] Sending: channel={channel}, pixel_count={len(data) // 3}, byte_count={len(data)}, "
+                  f"message_size={len(message)}, first_pixel={tuple(data[:3]) if data else None}")
             # Show first few pixels as hex
             hex_dump = ' '.join(f'{b:02x}' for b in data[:30])  # First 10 pixels
             print(f"[DEBUG] First 30 bytes (10 pixels): {hex_dump}")
@@ -69,19 +86,64 @@ class OPCClient:
             return False
 
 
-def pattern_solid(led_count, r, g, b):
-    """Solid color pattern"""
-    return [(r, g, b)] * led_count
+# Solid color patterns - payload is identical every frame, so it is built once
+SOLID_PATTERNS = {
+    'solid': (128, 128, 128),
+    'red': (255, 0, 0),
+    'green': (0, 255, 0),
+    'blue': (0, 0, 255),
+    'white': (255, 255, 255),
+}
 
 
-def pattern_rainbow(led_count, offset=0.0):
-    """Rainbow pattern"""
-    pixels = []
+def hue_wheel(led_count, offset=0.0):
+    """
+    Fully saturated hue wheel as flat RGB bytes
+    Pixel i gets hue (i / led_count + offset); matches colorsys.hsv_to_rgb(hue, 1.0, 1.0)
+    """
+    data = bytearray(led_count * 3)
     for i in range(led_count):
-        hue = ((i / led_count) + offset) % 1.0
-        r, g, b = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
-        pixels.append((int(r * 255), int(g * 255), int(b * 255)))
-    return pixels
+        h6 = (((i / led_count) + offset) % 1.0) * 6.0
+        sector = int(h6)
+        f = h6 - sector
+        fall = int((1.0 - f) * 255)
+        rise = int((1.0 - (1.0 - f)) * 255)  # Same rounding as colorsys
+        idx = i * 3
+        if sector == 0:
+            data[idx] = 255
+            data[idx + 1] = rise
+        elif sector == 1:
+            data[idx] = fall
+            data[idx + 1] = 255
+        elif sector == 2:
+            data[idx + 1] = 255
+            data[idx + 2] = rise
+        elif sector == 3:
+            data[idx + 1] = fall
+            data[idx + 2] = 255
+        elif sector == 4:
+            data[idx] = rise
+            data[idx + 2] = 255
+        else:
+            data[idx] = 255
+            data[idx + 2] = fall
+    return data
+
+
+# Hue wheels by led_count - built once, rainbow frames are rotations of them
+_RAINBOW_WHEELS = {}
+
+
+def pattern_rainbow(led_count, offset=0.0):
+    """
+    Rainbow pattern (flat RGB bytes)
+    Rotates a cached hue wheel, so offset is rounded to whole LEDs
+    """
+    wheel = _RAINBOW_WHEELS.get(led_count)
+    if wheel is None:
+        wheel = _RAINBOW_WHEELS[led_count] = bytes(hue_wheel(led_count))
+    shift = round(offset * led_count) % led_count * 3
+    return wheel[shift:] + wheel[:shift]
 
 
 def pattern_chase(led_count, position, length, r, g, b):
@@ -114,6 +176,39 @@ def pattern_discover_match(led_count, frame):
     return [color] * led_count
 
 
+# prctl option that sets the calling thread's timer slack (Linux only)
+PR_SET_TIMERSLACK = 29
+
+
+def reduce_timer_slack():
+    """
+    Drop the calling thread's kernel timer slack from the default 50us to 1ns
+    so sleeps wake up on time - best effort, does nothing off Linux
+    """
+    if not sys.platform.startswith('linux'):
+        return
+    try:
+        import ctypes
+        ctypes.CDLL(None, use_errno=True).prctl(PR_SET_TIMERSLACK, 1, 0, 0, 0)
+    except (OSError, AttributeError):
+        pass
+
+
+def precise_sleep_until(deadline):
+    """
+    Sleep until deadline (a time.monotonic() value)
+    Sleeps most of the wait, then spins the last ~100us (sleep overshoots by ~50us)
+    """
+    delay = deadline - time.monotonic()
+    if delay > 200e-6:
+        time.sleep(delay - 100e-6)
+    # sched_yield releases the GIL, so other threads aren't starved while spinning (not on Windows)
+    spin_yield = getattr(os, 'sched_yield', None)
+    while time.monotonic() < deadline:
+        if spin_yield:
+            spin_yield()
+
+
 def main():
     parser = argparse.ArgumentParser(description='OPC Test Client - Send test patterns to OPC server')
     parser.add_argument('--host', default='localhost', help='OPC server host (default: localhost)')
@@ -127,6 +222,8 @@ def main():
     parser.add_argument('--fps', type=int, default=30, help='Frames per second (default: 30)')
     parser.add_argument('--debug', action='store_true', help='Enable debug output (stats only)')
     parser.add_argument('--ddebug', action='store_true', help='Enable detailed debug (hex dumps every frame)')
+    parser.add_argument('--no-nodelay', action='store_true',
+                       help='Leave Nagle enabled on the socket (TCP_NODELAY is set by default)')
     
     args = parser.parse_args()
     
@@ -139,7 +236,7 @@ def main():
     print(f"Pattern: {args.pattern}, LEDs: {args.leds}, Duration: {args.duration}s, FPS: {args.fps}")
     
     # Create client and connect
-    client = OPCClient(args.host, args.port)
+    client = OPCClient(args.host, args.port, nodelay=not args.no_nodelay)
     if not client.connect():
         print("Failed to connect to server")
         sys.exit(1)
@@ -147,25 +244,22 @@ def main():
     print("✓ Connected")
     print()
     
+    # Static patterns: build the flat RGB payload once and resend it every frame
+    static_pixels = None
+    if args.pattern in SOLID_PATTERNS:
+        static_pixels = bytes(SOLID_PATTERNS[args.pattern]) * args.leds
+    
+    reduce_timer_slack()  # Pacing runs on this thread
     frame_time = 1.0 / args.fps
-    start_time = time.time()
+    start_time = time.monotonic()
+    next_deadline = start_time
     frame = 0
     
     try:
-        while (time.time() - start_time) < args.duration:
-            frame_start = time.time()
-            
+        while (time.monotonic() - start_time) < args.duration:
             # Generate pattern
-            if args.pattern == 'solid':
-                pixels = pattern_solid(args.leds, 128, 128, 128)
-            elif args.pattern == 'red':
-                pixels = pattern_solid(args.leds, 255, 0, 0)
-            elif args.pattern == 'green':
-                pixels = pattern_solid(args.leds, 0, 255, 0)
-            elif args.pattern == 'blue':
-                pixels = pattern_solid(args.leds, 0, 0, 255)
-            elif args.pattern == 'white':
-                pixels = pattern_solid(args.leds, 255, 255, 255)
+            if static_pixels is not None:
+                pixels = static_pixels
             elif args.pattern == 'discover':
                 pixels = pattern_discover_match(args.leds, frame)
             elif args.pattern == 'rainbow':
@@ -184,14 +278,18 @@ def main():
             
             # Status update
             if frame % args.fps == 0 and frame > 0:
-                elapsed = time.time() - start_time
+                elapsed = time.monotonic() - start_time
                 actual_fps = frame / elapsed if elapsed > 0 else 0
                 print(f"Frame {frame}, elapsed: {elapsed:.1f}s, actual FPS: {actual_fps:.1f}")
             
-            # Maintain frame rate
-            elapsed = time.time() - frame_start
-            if elapsed < frame_time:
-                time.sleep(frame_time - elapsed)
+            # Maintain frame rate against absolute deadlines so timing errors don't accumulate
+            next_deadline += frame_time
+            now = time.monotonic()
+            if now - next_deadline > 2 * frame_time:
+                # More than two frames behind - drop them rather than bursting to catch up
+                next_deadline = now
+            else:
+                precise_sleep_until(next_deadline)
             
             frame += 1
         
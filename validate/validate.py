@@ -6,15 +6,31 @@ Tests serial connections and LED strips with various patterns
 
 import sys
 import json
+import os
 import time
 import argparse
 import serial
-from typing import List, Tuple, Dict, Any
-import colorsys
+import threading
+from itertools import accumulate, chain
+from functools import lru_cache
+from operator import sub
+from typing import List, Tuple, Dict, Any, Union
+from queue import Queue, Empty, Full
+
+
+@lru_cache(maxsize=8)
+def _fletcher_ext_mask(length: int) -> Tuple[int, int]:
+    """
+    Positional XOR mask for the AWA fletcher_ext checksum, cached per frame length
+    For byte < 256: byte ^ position == (byte ^ (position & 0xFF)) + (position & ~0xFF),
+    so returns (the low position bytes as one little-endian int, sum of the high bits)
+    """
+    low = (bytes(range(256)) * (length // 256 + 1))[:length]
+    return int.from_bytes(low, 'little'), sum(p & ~0xFF for p in range(length))
 
 
 class LEDOutput:
-    """Handles serial output to LED strips"""
+    """Handles serial output to LED strips with a background writer thread"""
     
     def __init__(self, config: Dict[str, Any]):
         self.port = config['port']
@@ -23,9 +39,27 @@ class LEDOutput:
         self.led_count = config['led_count']
         self.pixel_format = config.get('pixel_format', None)  # None = passthrough
         self.ser = None
+        
+        # Bytes per pixel on the wire after pixel format transformation
+        if self.pixel_format in ('RGBW', 'GRBW'):
+            self.stride = 4
+        else:
+            self.stride = 3
+        
+        # Protocol headers and reused frames (header + pixel data [+ checksums]), built in open()
+        self._awa_header = None
+        self._awa_frame = None
+        self._ada_header = None
+        self._ada_frame = None
+        
+        # Frames waiting for the writer thread - the pacing loop never blocks on serial I/O
+        self.queue = Queue(maxsize=2)
+        self.running = False
+        self.worker_thread = None
+        self.dropped_frames = 0  # Frames discarded because the serial link couldn't keep up
     
     def open(self):
-        """Open serial connection"""
+        """Open serial connection and start the writer thread"""
         try:
             self.ser = serial.Serial(
                 self.port, 
@@ -33,154 +67,210 @@ class LEDOutput:
                 timeout=1
             )
             time.sleep(0.1)  # Allow device to initialize
-            return True
         except serial.SerialException as e:
             print(f"Error opening {self.port}: {e}")
             return False
+        
+        # Every frame is padded to led_count, so frame sizes and headers never change:
+        # build them once and only fill in pixels (+ checksums) per frame
+        if self.protocol == 'awa':
+            count_hi = (self.led_count - 1) >> 8 & 0xFF
+            count_lo = (self.led_count - 1) & 0xFF
+            crc = (count_hi ^ count_lo) ^ 0x55
+            self._awa_header = bytes([0x41, 0x77, 0x61, count_hi, count_lo, crc])  # 'Awa' + count + CRC
+            self._awa_frame = bytearray(6 + self.led_count * self.stride + 3)
+            self._awa_frame[0:6] = self._awa_header
+            _fletcher_ext_mask(self.led_count * self.stride)  # Build the checksum mask up front
+        else:
+            # Adalight header: 'Ada' + LED count high + LED count low + checksum
+            self._ada_header = bytes([
+                0x41, 0x64, 0x61,  # 'Ada'
+                (self.led_count >> 8) & 0xFF,
+                self.led_count & 0xFF,
+                (self.led_count >> 8) ^ (self.led_count & 0xFF) ^ 0x55
+            ])
+            self._ada_frame = bytearray(6 + self.led_count * self.stride)
+            self._ada_frame[0:6] = self._ada_header
+        
+        self.running = True
+        self.worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self.worker_thread.start()
+        return True
     
     def close(self):
-        """Close serial connection"""
+        """Wait for queued frames to be written, then close serial connection"""
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.queue.join()
+            self.running = False
+            self.worker_thread.join(timeout=1.0)
         if self.ser:
-            self.ser.close()
+            try:
+                # Let the last frame drain before closing
+                self.ser.flush()
+                self.ser.close()
+            except Exception:
+                # Port may already be disconnected - ignore errors during close
+                pass
+    
+    def put_frame(self, pixel_data: bytearray, debug=False):
+        """
+        Queue a frame for the writer thread
+        Non-blocking - drops the oldest queued frame if the writer is behind
+        """
+        try:
+            self.queue.put_nowait((pixel_data, debug))
+        except Full:
+            try:
+                self.queue.get_nowait()  # Discard oldest frame
+                self.queue.task_done()
+                self.dropped_frames += 1
+            except Empty:
+                pass  # Writer took it in the meantime
+            try:
+                self.queue.put_nowait((pixel_data, debug))
+            except Full:
+                self.dropped_frames += 1  # Still full somehow, skip this frame
+    
+    def _worker(self):
+        """Writer thread - blocks waiting for frames, sends to serial"""
+        while self.running:
+            try:
+                pixel_data, debug = self.queue.get(timeout=0.1)
+            except Empty:
+                # Timeout - check if still running
+                continue
+            try:
+                self._write_frame(pixel_data, debug)
+            finally:
+                self.queue.task_done()
+    
+    def _write_frame(self, pixel_data: bytearray, debug=False):
+        """Send a frame using the configured protocol (writer thread)"""
+        if not self.ser:
+            return
+        
+        try:
+            if self.protocol == 'awa':
+                self._send_awa_frame(pixel_data, debug=debug)
+            else:
+                self._send_adalight_frame(pixel_data)
+        except serial.SerialException as e:
+            print(f"✗ Serial error on {self.port}: {e}")
+            self.ser = None  # Mark as disconnected
     
-    def send_frame(self, pixels: List[Tuple[int, int, int]], debug=False):
+    def send_frame(self, pixels: Union[List[Tuple[int, int, int]], bytes], debug=False):
         """
         Send a frame of RGB pixels to the LED strip
-        pixels: List of (R, G, B) tuples
+        pixels: List of (R, G, B) tuples, or flat RGB bytes
         """
         if not self.ser:
             return False
         
-        # Pad or truncate to led_count
-        while len(pixels) < self.led_count:
-            pixels.append((0, 0, 0))
-        pixels = pixels[:self.led_count]
+        if isinstance(pixels, (bytes, bytearray)):
+            # Flat RGB bytes - truncate to led_count, pad with black below
+            # (copied, since transforms work in place)
+            pixel_data = bytearray(pixels[:self.led_count * 3])
+            pixel_data.extend(bytes(self.led_count * 3 - len(pixel_data)))
+        else:
+            # Pad or truncate to led_count (without modifying the caller's list)
+            if len(pixels) < self.led_count:
+                pixels = list(pixels) + [(0, 0, 0)] * (self.led_count - len(pixels))
+            else:
+                pixels = pixels[:self.led_count]
+            
+            # Flatten to RGB bytes once (in C) - everything below works on flat pixel data
+            pixel_data = bytearray(chain.from_iterable(pixels))
         
         if debug:
-            print(f"  Sending frame: {len(pixels)} pixels, first pixel: {pixels[0] if pixels else 'none'}")
+            print(f"  Sending frame: {len(pixel_data) // 3} pixels, "
+                  f"first pixel: {tuple(pixel_data[:3]) if pixel_data else 'none'}")
         
         # Apply pixel format transformation if specified
         if self.pixel_format:
-            pixels = self._transform_pixels(pixels)
+            pixel_data = self._transform_pixels(pixel_data)
         
-        # Send frame based on protocol
-        if self.protocol == 'awa':
-            self._send_awa_frame(pixels, debug=debug)
-        elif self.protocol == 'adalight':
-            self._send_adalight_frame(pixels)
-        else:
+        if self.protocol not in ('awa', 'adalight'):
             print(f"Protocol {self.protocol} not yet implemented")
             return False
         
+        # Hand off to the writer thread
+        self.put_frame(pixel_data, debug=debug)
         return True
     
-    def _transform_pixels(self, pixels: List[Tuple[int, int, int]]) -> List[Tuple]:
-        """Transform RGB pixels based on pixel_format"""
+    def _transform_pixels(self, pixel_data: bytearray) -> bytearray:
+        """Transform flat RGB pixel data based on pixel_format"""
         # RGB passthrough - no transformation needed
         if self.pixel_format == 'RGB' or self.pixel_format is None:
-            return pixels
+            return pixel_data
+        
+        # Channel shuffles use extended slices so the per-byte work runs in C
         
         # For same-size 3-channel transforms, transform in place
-        if self.pixel_format in ('GRB', 'BGR'):
-            pixel_count = len(pixels)
-            # Pre-allocate list
-            transformed = [None] * pixel_count
-            
-            if self.pixel_format == 'GRB':
-                for i in range(pixel_count):
-                    r, g, b = pixels[i]
-                    transformed[i] = (g, r, b)
-            else:  # BGR
-                for i in range(pixel_count):
-                    r, g, b = pixels[i]
-                    transformed[i] = (b, g, r)
-            
-            return transformed
+        if self.pixel_format == 'GRB':
+            pixel_data[0::3], pixel_data[1::3] = pixel_data[1::3], pixel_data[0::3]
+            return pixel_data
+        
+        if self.pixel_format == 'BGR':
+            pixel_data[0::3], pixel_data[2::3] = pixel_data[2::3], pixel_data[0::3]
+            return pixel_data
         
         # RGBW transforms - different size output
         if self.pixel_format in ('RGBW', 'GRBW'):
-            pixel_count = len(pixels)
-            # Pre-allocate list for 4-channel output
-            transformed = [None] * pixel_count
+            r = pixel_data[0::3]
+            g = pixel_data[1::3]
+            b = pixel_data[2::3]
+            
+            # Extract white channel and subtract from RGB
+            # (inline compare is ~3x faster than calling min() per pixel)
+            w = bytes([x if x < y and x < z else (y if y < z else z) for x, y, z in zip(r, g, b)])
+            r = bytes(map(sub, r, w))
+            g = bytes(map(sub, g, w))
+            b = bytes(map(sub, b, w))
             
+            transformed = bytearray(len(w) * 4)
             if self.pixel_format == 'RGBW':
-                for i in range(pixel_count):
-                    r, g, b = pixels[i]
-                    # Extract white channel and subtract from RGB
-                    w = min(r, g, b)
-                    transformed[i] = (r - w, g - w, b - w, w)
+                transformed[0::4] = r
+                transformed[1::4] = g
             else:  # GRBW
-                for i in range(pixel_count):
-                    r, g, b = pixels[i]
-                    # Extract white channel and subtract from RGB
-                    w = min(r, g, b)
-                    transformed[i] = (g - w, r - w, b - w, w)
+                transformed[0::4] = g
+                transformed[1::4] = r
+            transformed[2::4] = b
+            transformed[3::4] = w
             
             return transformed
         
         # Unknown format - return unchanged
-        return pixels
+        return pixel_data
     
-    def _send_adalight_frame(self, pixels: List[Tuple]):
-        """Send Adalight protocol frame"""
-        # Adalight header: 'Ada' + LED count high + LED count low + checksum
-        led_count = len(pixels)
-        header = bytearray([
-            0x41, 0x64, 0x61,  # 'Ada'
-            (led_count >> 8) & 0xFF,
-            led_count & 0xFF,
-            (led_count >> 8) ^ (led_count & 0xFF) ^ 0x55
-        ])
-        
-        # Build pixel data
-        data = bytearray()
-        for pixel in pixels:
-            for channel in pixel:
-                data.append(channel & 0xFF)
-        
-        # Send frame
-        self.ser.write(header + data)
-        self.ser.flush()
-    
-    def _send_awa_frame(self, pixels: List[Tuple], debug=False):
-        """Send AWA protocol frame (HyperSerialPico format)"""
-        led_count = len(pixels)
-        
-        # AWA header: 'Awa' + LED count high + LED count low + CRC
-        count_hi = (led_count - 1) >> 8 & 0xFF
-        count_lo = (led_count - 1) & 0xFF
-        crc = (count_hi ^ count_lo) ^ 0x55
-        
-        header = bytearray([
-            0x41, 0x77, 0x61,  # 'Awa'
-            count_hi,
-            count_lo,
-            crc
-        ])
-        
-        if debug:
-            print(f"  AWA Header: {header.hex()}, LED count: {led_count}")
+    def _send_adalight_frame(self, pixel_data: bytearray):
+        """Send Adalight protocol frame - writer thread only"""
+        # Preallocated frame: header already in place, see open()
+        frame = self._ada_frame
+        frame[6:] = pixel_data
         
-        # Build pixel data
-        data = bytearray()
-        for pixel in pixels:
-            for channel in pixel:
-                data.append(channel & 0xFF)
+        # Send frame (no flush - it blocks until the UART drains; the next write just queues)
+        self.ser.write(frame)
+    
+    def _send_awa_frame(self, data: bytearray, debug=False):
+        """Send AWA protocol frame (HyperSerialPico format) - writer thread only"""
+        # Preallocated frame: header already in place, see open()
+        frame = self._awa_frame
+        frame[6:-3] = data
         
         if debug:
+            print(f"  AWA Header: {frame[:6].hex()}, LED count: {len(data) // self.stride}")
             print(f"  Pixel data: {len(data)} bytes, first 12 bytes: {data[:12].hex() if len(data) >= 12 else data.hex()}")
         
         # Calculate Fletcher checksums (matches HyperSerialPico implementation)
-        fletcher1 = 0
-        fletcher2 = 0
-        fletcher_ext = 0
-        position = 0
-        
-        for byte in data:
-            fletcher1 = (fletcher1 + byte) % 255
-            fletcher2 = (fletcher2 + fletcher1) % 255
-            fletcher_ext = (fletcher_ext + (byte ^ position)) % 255
-            position += 1
+        # The reference loop reduces mod 255 every byte; since the sums are linear the
+        # reduction can happen once at the end, which lets the loops run in C:
+        #   fletcher1    = sum(byte)
+        #   fletcher2    = sum of the running fletcher1 values (prefix sums)
+        #   fletcher_ext = sum(byte ^ position), XORed as one big int against a cached mask
+        fletcher1 = sum(data) % 255
+        fletcher2 = sum(accumulate(data)) % 255
+        mask, high = _fletcher_ext_mask(len(data))
+        fletcher_ext = (sum((int.from_bytes(data, 'little') ^ mask).to_bytes(len(data), 'little')) + high) % 255
         
         # Special case: if fletcher_ext is 0x41 ('A'), use 0xaa instead
         if fletcher_ext == 0x41:
@@ -189,21 +279,22 @@ class LEDOutput:
         if debug:
             print(f"  Fletcher: {fletcher1:02x} {fletcher2:02x} {fletcher_ext:02x}")
         
-        # Send frame: header + data + fletcher checksums
-        frame = header + data + bytearray([fletcher1, fletcher2, fletcher_ext])
+        # Frame: header + data + fletcher checksums
+        frame[-3] = fletcher1
+        frame[-2] = fletcher2
+        frame[-1] = fletcher_ext
         
         if debug:
             print(f"  Total frame size: {len(frame)} bytes")
         
         self.ser.write(frame)
-        self.ser.flush()
 
 
 class TestPattern:
     """Base class for test patterns"""
     
-    def generate(self, frame: int, led_count: int) -> List[Tuple[int, int, int]]:
-        """Generate pixel data for a given frame number"""
+    def generate(self, frame: int, led_count: int) -> Union[List[Tuple[int, int, int]], bytes]:
+        """Generate pixel data for a given frame number (RGB tuples or flat RGB bytes)"""
         raise NotImplementedError
 
 
@@ -214,9 +305,13 @@ class SolidColor(TestPattern):
         self.r = r
         self.g = g
         self.b = b
+        self._cache = {}  # led_count -> frame (identical every frame, built once)
     
-    def generate(self, frame: int, led_count: int) -> List[Tuple[int, int, int]]:
-        return [(self.r, self.g, self.b)] * led_count
+    def generate(self, frame: int, led_count: int) -> bytes:
+        pixels = self._cache.get(led_count)
+        if pixels is None:
+            pixels = self._cache[led_count] = bytes((self.r, self.g, self.b)) * led_count
+        return pixels
 
 
 class Blink(TestPattern):
@@ -227,14 +322,51 @@ class Blink(TestPattern):
         self.g = g
         self.b = b
         self.interval = interval
+        self._cache = {}  # led_count -> (on frame, off frame), built once
     
-    def generate(self, frame: int, led_count: int) -> List[Tuple[int, int, int]]:
+    def generate(self, frame: int, led_count: int) -> bytes:
+        frames = self._cache.get(led_count)
+        if frames is None:
+            frames = self._cache[led_count] = (bytes((self.r, self.g, self.b)) * led_count,
+                                               bytes(led_count * 3))
+        
         # Blink on/off based on time
         on = (int(time.time() / self.interval) % 2) == 0
-        if on:
-            return [(self.r, self.g, self.b)] * led_count
+        return frames[0] if on else frames[1]
+
+
+def hue_wheel(led_count: int, offset: float = 0.0) -> bytearray:
+    """
+    Fully saturated hue wheel as flat RGB bytes
+    Pixel i gets hue (i / led_count + offset); matches colorsys.hsv_to_rgb(hue, 1.0, 1.0)
+    """
+    data = bytearray(led_count * 3)
+    for i in range(led_count):
+        h6 = (((i / led_count) + offset) % 1.0) * 6.0
+        sector = int(h6)
+        f = h6 - sector
+        fall = int((1.0 - f) * 255)
+        rise = int((1.0 - (1.0 - f)) * 255)  # Same rounding as colorsys
+        idx = i * 3
+        if sector == 0:
+            data[idx] = 255
+            data[idx + 1] = rise
+        elif sector == 1:
+            data[idx] = fall
+            data[idx + 1] = 255
+        elif sector == 2:
+            data[idx + 1] = 255
+            data[idx + 2] = rise
+        elif sector == 3:
+            data[idx + 1] = fall
+            data[idx + 2] = 255
+        elif sector == 4:
+            data[idx] = rise
+            data[idx + 2] = 255
         else:
-            return [(0, 0, 0)] * led_count
+            data[idx] = 255
+            data[idx + 2] = fall
+    return data
 
 
 class HueCircle(TestPattern):
@@ -242,18 +374,16 @@ class HueCircle(TestPattern):
     
     def __init__(self, speed: float = 0.1):
         self.speed = speed
+        self._wheel = None  # Hue wheel for the current led_count, built on first use
     
-    def generate(self, frame: int, led_count: int) -> List[Tuple[int, int, int]]:
-        pixels = []
-        offset = frame * self.speed
-        
-        for i in range(led_count):
-            # Calculate hue based on position
-            hue = ((i / led_count) + offset) % 1.0
-            r, g, b = colorsys.hsv_to_rgb(hue, 1.0, 1.0)
-            pixels.append((int(r * 255), int(g * 255), int(b * 255)))
+    def generate(self, frame: int, led_count: int) -> bytes:
+        # Rotation is a cyclic shift of the same wheel - compute HSV once, then slice
+        if self._wheel is None or len(self._wheel) != led_count * 3:
+            self._wheel = bytes(hue_wheel(led_count))
         
-        return pixels
+        # Offset rounded to whole LEDs
+        shift = round(frame * self.speed * led_count) % led_count * 3
+        return self._wheel[shift:] + self._wheel[:shift]
 
 
 class Chase(TestPattern):
@@ -265,16 +395,28 @@ class Chase(TestPattern):
         self.b = b
         self.length = length
         self.speed = speed
-    
-    def generate(self, frame: int, led_count: int) -> List[Tuple[int, int, int]]:
-        pixels = [(0, 0, 0)] * led_count
+        self._color = bytes((r, g, b))
+        self._buf = None  # Persistent frame, only the chase window changes between frames
+        self._lit = ()    # LED indices lit in _buf
+    
+    def generate(self, frame: int, led_count: int) -> bytearray:
+        # Returns the persistent buffer - callers must not modify it (send_frame copies it)
+        buf = self._buf
+        if buf is None or len(buf) != led_count * 3:
+            buf = self._buf = bytearray(led_count * 3)
+            self._lit = ()
         position = int(frame * self.speed) % led_count
         
-        for i in range(self.length):
-            idx = (position + i) % led_count
-            pixels[idx] = (self.r, self.g, self.b)
+        # Clear the previous window, then light the new one
+        for idx in self._lit:
+            buf[idx * 3:idx * 3 + 3] = b'\x00\x00\x00'
         
-        return pixels
+        lit = [(position + i) % led_count for i in range(self.length)]
+        for idx in lit:
+            buf[idx * 3:idx * 3 + 3] = self._color
+        self._lit = lit
+        
+        return buf
 
 
 def load_config(config_path: str) -> Dict[str, Any]:
@@ -290,18 +432,51 @@ def load_config(config_path: str) -> Dict[str, Any]:
         sys.exit(1)
 
 
+# prctl option that sets the calling thread's timer slack (Linux only)
+PR_SET_TIMERSLACK = 29
+
+
+def reduce_timer_slack() -> None:
+    """
+    Drop the calling thread's kernel timer slack from the default 50us to 1ns
+    so sleeps wake up on time - best effort, does nothing off Linux
+    """
+    if not sys.platform.startswith('linux'):
+        return
+    try:
+        import ctypes
+        ctypes.CDLL(None, use_errno=True).prctl(PR_SET_TIMERSLACK, 1, 0, 0, 0)
+    except (OSError, AttributeError):
+        pass
+
+
+def precise_sleep_until(deadline: float) -> None:
+    """
+    Sleep until deadline (a time.monotonic() value)
+    Sleeps most of the wait, then spins the last ~100us (sleep overshoots by ~50us)
+    """
+    delay = deadline - time.monotonic()
+    if delay > 200e-6:
+        time.sleep(delay - 100e-6)
+    # sched_yield releases the GIL, so other threads aren't starved while spinning (not on Windows)
+    spin_yield = getattr(os, 'sched_yield', None)
+    while time.monotonic() < deadline:
+        if spin_yield:
+            spin_yield()
+
+
 def run_test(outputs: List[LEDOutput], pattern: TestPattern, duration: float, fps: int, debug: bool = False):
     """Run a test pattern on all outputs"""
     print(f"Running pattern for {duration:.1f} seconds at {fps} FPS...")
     
+    reduce_timer_slack()  # Pacing runs on this thread
     frame_time = 1.0 / fps
-    start_time = time.time()
+    start_time = time.monotonic()
+    next_deadline = start_time
     frame = 0
     
     try:
-        while (time.time() - start_time) < duration:
-            frame_start = time.time()
-            
+        while (time.monotonic() - start_time) < duration:
             # Generate and send frame to all outputs
             # Debug first frame only to avoid spam
             show_debug = debug and frame == 0
@@ -312,10 +487,14 @@ def run_test(outputs: List[LEDOutput], pattern: TestPattern, duration: float, fp
                 pixels = pattern.generate(frame, output.led_count)
                 output.send_frame(pixels, debug=show_debug)
             
-            # Maintain frame rate
-            elapsed = time.time() - frame_start
-            if elapsed < frame_time:
-                time.sleep(frame_time - elapsed)
+            # Maintain frame rate against absolute deadlines so timing errors don't accumulate
+            next_deadline += frame_time
+            now = time.monotonic()
+            if now - next_deadline > 2 * frame_time:
+                # More than two frames behind - drop them rather than bursting to catch up
+                next_deadline = now
+            else:
+                precise_sleep_until(next_deadline)
             
             frame += 1
         
@@ -324,6 +503,9 @@ def run_test(outputs: List[LEDOutput], pattern: TestPattern, duration: float, fp
             output.send_frame([(0, 0, 0)] * output.led_count)
         
         print(f"✓ Completed {frame} frames")
+        if debug:
+            for output in outputs:
+                print(f"  {output.port}: {output.dropped_frames} frames dropped (serial link too slow)")
         
     except KeyboardInterrupt:
         print("\n✗ Test interrupted")
@@ -377,6 +559,13 @@ Examples:
     
     args = parser.parse_args()
     
+    # Color values go straight into the frame bytes
+    for name in ('r', 'g', 'b'):
+        value = getattr(args, name)
+        if value is not None and not 0 <= value <= 255:
+            print(f"Error: --{name} must be between 0 and 255 (got {value})")
+            sys.exit(1)
+    
     # Load configuration
     config = load_config(args.config)
     
@@ -9,8 +9,69 @@ import json
 import os
 import serial
 import argparse
+import random
+import select
 import time
-from typing import List, Dict, Optional, Any
+import threading
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Callable, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import asyncio  # Annotations only - imported lazily at runtime, see AsyncWLEDConfigurator
+
+try:
+    import orjson  # Optional - parses multi-KB device states several times faster
+except ImportError:
+    orjson = None
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON from bytes - both parsers decode UTF-8 in C, no intermediate str is built"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _first_json_object(data: bytes) -> Any:
+    """
+    Parse the first complete JSON object in data, ignoring anything before or after it
+    Bytes that are not valid UTF-8 (line noise, partial debug output) are skipped
+    Raises json.JSONDecodeError if no complete object is present yet
+    """
+    start = data.find(b'{')
+    if start < 0:
+        raise json.JSONDecodeError("Expecting '{'", '', 0)
+    try:
+        return _json_loads(data[start:] if start else data)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        pass
+    # Incomplete, more bytes follow the object (a second reply, debug output) or invalid UTF-8 -
+    # decode leniently and let raw_decode stop at the end of the first object
+    return _JSON_DECODER.raw_decode(data[start:].decode('utf-8', 'ignore'))[0]
+
+
+def _json_command(obj: Dict[str, Any]) -> bytes:
+    """Encode a JSON API command as newline-terminated bytes, ready to write"""
+    if orjson is not None:
+        return orjson.dumps(obj) + b'\n'
+    return (json.dumps(obj) + '\n').encode('utf-8')
+
+
+@lru_cache(maxsize=None)
+def _ada_probe_frame(led_count: int) -> bytes:
+    """
+    Adalight frame of led_count black LEDs - built once per count, immutable so it is written as-is
+    'Ada' + LED count (big endian) + checksum + RGB data
+    """
+    count = led_count.to_bytes(2, 'big')
+    return b'Ada' + count + bytes([count[0] ^ count[1] ^ 0x55]) + bytes(3 * led_count)
+
+
+# JSON API baud rates found by detect_json_api_baud_rate, keyed by MAC (or port if unknown)
+# Tried first on the next detection, e.g. when a device is listed more than once in config
+_detected_rate_cache: Dict[str, int] = {}
 
 
 class WLEDDevice:
@@ -25,9 +86,53 @@ class WLEDDevice:
         self.mac = config.get('mac', 'N/A')
         self.config = config
         self.baud_rate_verified = False  # Track if we've verified the baud rate
+        self._serial = None  # Cached open port, see port_handle()
+        self.state_cache = None  # (time.monotonic(), state) from the last successful query
     
     def __str__(self):
         return f"{self.device_name} ({self.port})"
+    
+    def open_port(self, baud_rate: int, timeout: Optional[float]) -> serial.Serial:
+        """
+        Open a new, uncached serial port at baud_rate
+        Configured before opening so DTR/RTS are never asserted - toggling them is what
+        resets ESP32 boards through their auto-reset circuit
+        """
+        ser = serial.Serial(timeout=timeout, dsrdtr=False, rtscts=False)
+        ser.port = self.port
+        ser.baudrate = baud_rate
+        ser.dtr = False
+        ser.rts = False
+        ser.open()
+        return ser
+    
+    def port_handle(self) -> serial.Serial:
+        """
+        Return an open serial port at the JSON API baud rate, reusing it across calls
+        Opening the port costs 100ms+ and can reset the ESP32 over USB-CDC
+        """
+        if self._serial is None or not self._serial.is_open:
+            self._serial = self.open_port(self.baud_rate, timeout=1.0)
+            if sys.platform.startswith('linux'):
+                # Have the USB-serial driver hand over received bytes immediately instead of
+                # batching them for up to 16ms (ASYNC_LOW_LATENCY) - not every driver supports it
+                try:
+                    self._serial.set_low_latency_mode(True)
+                except (AttributeError, NotImplementedError, ValueError, OSError):
+                    pass
+            time.sleep(0.2)  # Let port settle - WLED needs time
+        elif self._serial.baudrate != self.baud_rate:
+            self._serial.baudrate = self.baud_rate  # Left at another rate by a scan
+        return self._serial
+    
+    def close(self):
+        """Close the cached serial port, if open"""
+        if self._serial is not None:
+            try:
+                self._serial.close()
+            except (serial.SerialException, OSError):
+                pass
+            self._serial = None
 
 
 class WLEDConfigurator:
@@ -47,15 +152,241 @@ class WLEDConfigurator:
         2000000: 0xB8,  # Not in official docs, but trying next byte for 2MB
     }
     
-    COMMON_BAUD_RATES = list(BAUD_RATE_COMMANDS.keys())
+    # Ready-to-write command bytes for each rate
+    BAUD_RATE_CMDBYTES = {rate: bytes([cmd]) for rate, cmd in BAUD_RATE_COMMANDS.items()}
+    
+    COMMON_BAUD_RATES = tuple(BAUD_RATE_COMMANDS)
+    
+    # Number of LEDs in the Adalight frame written by discover_baud_rates at each rate
+    ADA_PROBE_LED_COUNT = 10
+    
+    # Fixed JSON API commands - written as-is, no serialization per call
+    CMD_VERBOSE_QUERY = b'{"v":true}\n'
+    # LIVE mode change plus full state reply in one exchange
+    CMD_LIVE_VERBOSE = {True: b'{"live":true,"v":true}\n', False: b'{"live":false,"v":true}\n'}
+    CMD_SAVE = b'/save\n'
+    
+    # Largest read from the port fd in one call - a full WLED state is a few KB
+    READ_CHUNK_SIZE = 65536
+    
+    # Time WLED takes to start answering a JSON API request, before its reply is on the wire
+    RESPONSE_LATENCY = 0.3
+    
+    # Upper bound on the size of a full state reply to {"v":true} - a few KB depending on build
+    STATE_RESPONSE_BYTES = 4096
+    
+    # Upper bound on an acknowledgment such as {"success":true}
+    ACK_RESPONSE_BYTES = 128
+    
+    # How often to check for incoming bytes while waiting for a response (no select() on Windows)
+    RESPONSE_POLL_INTERVAL = 0.005
+    
+    # How long a queried device state is reused before asking the device again (seconds)
+    STATE_CACHE_TTL = 0.5
+    
+    # Base delay before retrying a failed state query, doubled on each further attempt (seconds)
+    RETRY_BACKOFF = 0.05
+    
+    # Upper bound on worker threads when talking to several devices at once
+    MAX_PARALLEL_DEVICES = 32
     
     def __init__(self, debug: bool = False):
         self.debug = debug
+        self._output = threading.local()  # Per-thread line buffer, see run_parallel()
+    
+    def _print(self, message: str = ""):
+        """Print a line, or buffer it if this thread is collecting output for run_parallel()"""
+        lines = getattr(self._output, 'lines', None)
+        if lines is not None:
+            lines.append(message)
+        else:
+            print(message)
     
-    def _log(self, message: str):
-        """Print debug messages if debug mode is enabled"""
-        if self.debug:
-            print(f"[DEBUG] {message}")
+    def _log(self, message: str, *args):
+        """
+        Print debug messages if debug mode is enabled
+        message is %-formatted with args only when printed, bytes args are decoded then
+        """
+        if not self.debug:
+            return
+        if args:
+            message = message % tuple(
+                arg.decode('utf-8', errors='ignore').strip() if isinstance(arg, (bytes, bytearray)) else arg
+                for arg in args)
+        self._print(f"[DEBUG] {message}")
+    
+    def run_parallel(self, func: Callable[..., Any], devices: List[WLEDDevice], *args,
+                     quiet: bool = False) -> List[Any]:
+        """
+        Call func(device, *args) for all devices concurrently - each device has its own
+        serial port, and serial I/O releases the GIL
+        Config entries sharing a port (a device listed more than once) take turns in one worker,
+        so their commands never interleave on the wire
+        Each call's output is buffered and printed as one block, in device order
+        (or discarded if quiet)
+        Returns the results in device order
+        """
+        groups: Dict[str, List[WLEDDevice]] = {}
+        for device in devices:
+            groups.setdefault(device.port, []).append(device)
+        
+        def run_group(group, call):
+            results = []
+            for device in group:
+                results.append(call(device))
+                if len(group) > 1:
+                    device.close()  # Release the port before the next entry opens its own handle
+            return results
+        
+        if len(groups) <= 1 and not quiet:
+            return run_group(devices, lambda device: func(device, *args))
+        
+        def collect(device):
+            self._output.lines = []
+            try:
+                result = func(device, *args)
+                return result, self._output.lines
+            finally:
+                self._output.lines = None
+        
+        from concurrent.futures import ThreadPoolExecutor  # Deferred - ~20ms to import, only needed here
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.MAX_PARALLEL_DEVICES, len(groups)))) as executor:
+            futures = {port: executor.submit(run_group, group, collect) for port, group in groups.items()}
+            pending = {}
+            for device in devices:
+                if device.port not in pending:
+                    pending[device.port] = iter(futures[device.port].result())
+                result, lines = next(pending[device.port])
+                if not quiet:
+                    for line in lines:
+                        print(line)
+                results.append(result)
+        return results
+    
+    @staticmethod
+    def _posix_fd(ser: serial.Serial) -> Optional[int]:
+        """
+        File descriptor of an open port on POSIX, else None
+        Reading and writing the fd directly skips pyserial's per-call timeout and select() setup
+        """
+        if os.name != 'posix':
+            return None
+        try:
+            return ser.fileno()
+        except (AttributeError, OSError):
+            return None
+    
+    def _write(self, ser: serial.Serial, data: bytes):
+        """Write data to an open port - straight to the fd on POSIX"""
+        fd = self._posix_fd(ser)
+        if fd is None:
+            ser.write(data)
+            return
+        
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(fd, view):]
+            except BlockingIOError:
+                # Port opened non-blocking and the driver's buffer is full - wait until it drains
+                if not select.select([], [fd], [], 1.0)[1]:
+                    raise serial.SerialTimeoutException('Write timeout')
+    
+    def _expected_response_time(self, baud_rate: int, n_bytes: int = STATE_RESPONSE_BYTES) -> float:
+        """
+        How long to wait for a reply of up to n_bytes at baud_rate (10 bits per byte on the wire)
+        A full state takes ~0.35s to transfer at 115200 baud but only ~20ms at 2M
+        """
+        return self.RESPONSE_LATENCY + n_bytes * 10 / baud_rate
+    
+    def _read_response(self, ser: serial.Serial, timeout: float) -> bytes:
+        """
+        Read from an open port until a complete JSON response arrives or timeout expires
+        Returns everything read (may be empty, or incomplete on timeout)
+        """
+        return self._read_json(ser, timeout)[0]
+    
+    def _read_json(self, ser: serial.Serial, timeout: float) -> Tuple[bytes, Optional[Any]]:
+        """
+        Read from an open port until the first complete JSON object has arrived or timeout expires
+        Returns as soon as the object is complete instead of sleeping a fixed time
+        Returns (everything read, parsed object or None if no complete object arrived)
+        """
+        deadline = time.monotonic() + timeout
+        
+        # On POSIX, block on the port's file descriptor - select() returns the moment bytes
+        # arrive. Elsewhere (Windows COM ports) fall back to polling in_waiting.
+        fd = self._posix_fd(ser)
+        
+        response = bytearray()  # Appended to in place - a state arrives in many small chunks
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            
+            if fd is not None:
+                if not select.select([fd], [], [], remaining)[0]:
+                    continue
+                try:
+                    chunk = os.read(fd, self.READ_CHUNK_SIZE)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    raise serial.SerialException(
+                        'device reports readiness to read but returned no data (device disconnected?)')
+            else:
+                waiting = ser.in_waiting
+                if not waiting:
+                    time.sleep(self.RESPONSE_POLL_INTERVAL)
+                    continue
+                chunk = ser.read(waiting)
+            response += chunk
+            
+            # A complete object ends with '}' - only then is a parse attempt worthwhile
+            if b'}' not in chunk:
+                continue
+            try:
+                return bytes(response), _first_json_object(response)
+            except json.JSONDecodeError:
+                pass  # Incomplete - keep reading
+        
+        return bytes(response), None
+    
+    def _send_command(self, device: WLEDDevice, command: bytes, response_timeout: float,
+                      action: str) -> Optional[bytes]:
+        """
+        Write a command to the device and wait up to response_timeout for its acknowledgment
+        Invalidates the cached state, since the command may change it
+        Returns the response (empty if the device sent none), or None on failure
+        """
+        device.state_cache = None
+        
+        try:
+            ser = device.port_handle()
+            
+            # Clear stale input
+            ser.reset_input_buffer()
+            
+            self._log("Sending: %s", command)
+            
+            self._write(ser, command)
+            
+            # Wait for acknowledgment (returns early once the device answers)
+            response = self._read_response(ser, response_timeout) if response_timeout > 0 else b''
+            if response:
+                self._log("Response: %s", response)
+            
+            return response
+            
+        except (serial.SerialException, OSError) as e:
+            device.close()  # Reopened on next use
+            self._print(f"Error: Cannot open serial port {device.port}: {e}")
+            return None
+        except Exception as e:
+            self._print(f"Error {action}: {e}")
+            return None
     
     def detect_json_api_baud_rate(self, device: WLEDDevice) -> Optional[int]:
         """
@@ -65,50 +396,43 @@ class WLEDConfigurator:
         
         Returns the working baud rate, or None if none found
         """
-        self._log(f"Scanning for JSON API baud rate on {device.port}")
+        self._log("Scanning for JSON API baud rate on %s", device.port)
         
-        # Try common baud rates, starting with default
-        test_rates = [115200, 230400, 460800, 500000, 576000, 921600, 1000000, 1500000]
+        # Try the likely rates first - the last detected rate, the current rate and the
+        # configured LED data rate - then the remaining common rates, starting with default
+        cache_key = device.mac if device.mac != 'N/A' else device.port
+        likely_rates = [_detected_rate_cache.get(cache_key), device.baud_rate, device.led_data_baud_rate]
+        common_rates = [115200, 230400, 460800, 500000, 576000, 921600, 1000000, 1500000]
+        test_rates = list(dict.fromkeys(rate for rate in likely_rates + common_rates if rate))
         
         for baud_rate in test_rates:
-            self._log(f"Testing JSON API at {baud_rate} baud")
+            self._log("Testing JSON API at %s baud", baud_rate)
             
             try:
-                with serial.Serial(device.port, baud_rate, timeout=1.0) as ser:
-                    # Let port settle
-                    time.sleep(0.1)
-                    
-                    # Clear buffers
-                    ser.reset_input_buffer()
-                    ser.reset_output_buffer()
-                    
-                    # Send JSON query
-                    query = b'{"v":true}\n'
-                    ser.write(query)
-                    ser.flush()
-                    
-                    # Wait for response
-                    time.sleep(0.5)
-                    
-                    if ser.in_waiting > 0:
-                        response = ser.read(ser.in_waiting)
+                ser = device.port_handle()
+                ser.baudrate = baud_rate
+                
+                # Clear stale input
+                ser.reset_input_buffer()
+                
+                # Send JSON query
+                query = self.CMD_VERBOSE_QUERY
+                self._write(ser, query)
+                
+                # Wait for response
+                response, data = self._read_json(ser, self._expected_response_time(baud_rate))
+                
+                # Validate it's a WLED response
+                if isinstance(data, dict) and 'info' in data and 'state' in data:
+                    self._log("✓ JSON API responds at %s baud", baud_rate)
+                    _detected_rate_cache[cache_key] = baud_rate
+                    return baud_rate
                         
-                        # Try to parse as JSON
-                        try:
-                            response_str = response.decode('utf-8', errors='ignore')
-                            data = json.loads(response_str)
-                            
-                            # Validate it's a WLED response
-                            if 'info' in data and 'state' in data:
-                                self._log(f"✓ JSON API responds at {baud_rate} baud")
-                                return baud_rate
-                        except (json.JSONDecodeError, UnicodeDecodeError):
-                            continue
-                            
-            except (serial.SerialException, OSError):
+            except (serial.SerialException, OSError, ValueError):
+                device.close()  # Reopened on next use
                 continue
         
-        self._log(f"✗ JSON API not responding at any tested baud rate")
+        self._log("✗ JSON API not responding at any tested baud rate")
         return None
     
     def query_device_state(self, device: WLEDDevice, retry_count: int = 2) -> Optional[Dict[str, Any]]:
@@ -118,159 +442,151 @@ class WLEDConfigurator:
         """
         for attempt in range(retry_count + 1):
             if attempt > 0:
-                self._log(f"Retry {attempt}/{retry_count}")
-                time.sleep(0.5)  # Wait before retry
+                self._log("Retry %s/%s", attempt, retry_count)
+                # Back off exponentially, with jitter so devices sharing a hub don't retry in lockstep
+                time.sleep(self.RETRY_BACKOFF * 2 ** attempt + random.uniform(0, self.RETRY_BACKOFF))
             
-            self._log(f"Querying device state on {device.port}")
+            self._log("Querying device state on %s", device.port)
             
             try:
-                with serial.Serial(device.port, device.baud_rate, timeout=2.0) as ser:
-                    # Let port settle - WLED needs time
-                    time.sleep(0.2)
-                    
-                    # Clear buffers multiple times to ensure clean state
-                    ser.reset_input_buffer()
-                    ser.reset_output_buffer()
-                    time.sleep(0.1)
-                    ser.reset_input_buffer()
-                    
-                    # Send state query
-                    query = b'{"v":true}\n'
-                    self._log(f"Sending: {query.decode().strip()}")
-                    
-                    ser.write(query)
-                    ser.flush()
-                    
-                    # Wait longer for response - WLED can be slow
-                    time.sleep(0.8)
-                    
-                    if ser.in_waiting == 0:
-                        if attempt < retry_count:
-                            continue  # Try again
-                        print(f"Error querying {device.port}: No response from device")
-                        print(f"  Device may be:")
-                        print(f"    - Not powered on")
-                        print(f"    - Not a WLED device")
-                        print(f"    - Using a different baud rate for JSON API")
-                        print(f"    - Busy processing other commands")
-                        return None
-                    
-                    # Read response
-                    response = b''
-                    while ser.in_waiting > 0:
-                        chunk = ser.read(ser.in_waiting)
-                        response += chunk
-                        time.sleep(0.02)
-                    
-                    if not response:
-                        if attempt < retry_count:
-                            continue  # Try again
-                        print(f"Error querying {device.port}: Empty response after reading")
-                        return None
-                    
-                    # Parse JSON
+                ser = device.port_handle()
+                
+                # Clear stale input
+                ser.reset_input_buffer()
+                
+                # Send state query
+                query = self.CMD_VERBOSE_QUERY
+                self._log("Sending: %s", query)
+                
+                self._write(ser, query)
+                
+                # Wait for the complete response - WLED can be slow
+                response, data = self._read_json(ser, self._expected_response_time(device.baud_rate))
+                
+                if not response:
+                    if attempt < retry_count:
+                        continue  # Try again
+                    self._print(f"Error querying {device.port}: No response from device")
+                    self._print(f"  Device may be:")
+                    self._print(f"    - Not powered on")
+                    self._print(f"    - Not a WLED device")
+                    self._print(f"    - Using a different baud rate for JSON API")
+                    self._print(f"    - Busy processing other commands")
+                    return None
+                
+                # Check the parsed response
+                self._log("Received: %s", response)
+                
+                if data is None:
+                    if attempt < retry_count:
+                        continue  # Try again
+                    self._print(f"Error querying {device.port}: Invalid or incomplete JSON response")
                     response_str = response.decode('utf-8', errors='ignore')
-                    self._log(f"Received: {response_str}")
-                    
-                    try:
-                        data = json.loads(response_str)
-                    except json.JSONDecodeError as e:
-                        if attempt < retry_count:
-                            continue  # Try again
-                        print(f"Error querying {device.port}: Invalid JSON response")
-                        print(f"  Received: {response_str[:100]}{'...' if len(response_str) > 100 else ''}")
-                        print(f"  JSON error: {e}")
-                        print(f"  Device may not be a WLED device or is sending corrupt data")
-                        return None
-                    
-                    # Validate response structure
-                    if 'info' not in data or 'state' not in data:
-                        if attempt < retry_count:
-                            continue  # Try again
-                        print(f"Error querying {device.port}: Invalid WLED response structure")
-                        print(f"  Missing required fields: 'info' and/or 'state'")
-                        print(f"  Device may not be a WLED device")
-                        return None
-                    
-                    # Success!
-                    return data
-                    
-            except serial.SerialException as e:
+                    self._print(f"  Received: {response_str[:100]}{'...' if len(response_str) > 100 else ''}")
+                    self._print(f"  Device may not be a WLED device or is sending corrupt data")
+                    return None
+                
+                # Validate response structure
+                if not isinstance(data, dict) or 'info' not in data or 'state' not in data:
+                    if attempt < retry_count:
+                        continue  # Try again
+                    self._print(f"Error querying {device.port}: Invalid WLED response structure")
+                    self._print(f"  Missing required fields: 'info' and/or 'state'")
+                    self._print(f"  Device may not be a WLED device")
+                    return None
+                
+                # Success!
+                device.state_cache = (time.monotonic(), data)
+                return data
+                
+            except (serial.SerialException, OSError) as e:
+                device.close()  # Reopened on next use
                 if attempt < retry_count:
                     continue  # Try again
-                print(f"Error querying {device.port}: Cannot open serial port")
-                print(f"  Details: {e}")
-                print(f"  Possible causes:")
-                print(f"    - Port is already in use by another program")
-                print(f"    - Device is not connected")
-                print(f"    - Insufficient permissions (try running as administrator/sudo)")
-                print(f"    - Wrong port specified in config")
+                self._print(f"Error querying {device.port}: Cannot open serial port")
+                self._print(f"  Details: {e}")
+                self._print(f"  Possible causes:")
+                self._print(f"    - Port is already in use by another program")
+                self._print(f"    - Device is not connected")
+                self._print(f"    - Insufficient permissions (try running as administrator/sudo)")
+                self._print(f"    - Wrong port specified in config")
                 return None
             except Exception as e:
                 if attempt < retry_count:
                     continue  # Try again
-                print(f"Error querying {device.port}: Unexpected error")
-                print(f"  Details: {e}")
+                self._print(f"Error querying {device.port}: Unexpected error")
+                self._print(f"  Details: {e}")
                 return None
         
         # Should never reach here
         return None
     
-    def set_live_mode(self, device: WLEDDevice, enable: bool) -> bool:
+    def set_and_verify_live_mode(self, device: WLEDDevice, enable: bool) -> Optional[bool]:
         """
-        Enable or disable LIVE mode on WLED device
-        Returns True on success, False on failure
+        Set LIVE mode and read the resulting state back in one exchange
+        Sends {"live": ..., "v": true} - WLED applies the change and replies with its full state
+        Returns the LIVE mode the device reports, or None if no valid state came back
         """
         mode_str = "ENABLED" if enable else "DISABLED"
-        self._log(f"Setting LIVE mode to {mode_str} on {device.port}")
+        self._log("Setting and verifying LIVE mode %s on %s", mode_str, device.port)
+        device.state_cache = None
         
         try:
-            with serial.Serial(device.port, device.baud_rate, timeout=1.0) as ser:
-                # Let port settle
-                time.sleep(0.1)
-                
-                # Clear buffers
-                ser.reset_input_buffer()
-                ser.reset_output_buffer()
-                
-                # Send LIVE mode command
-                # The 'live' property is sent directly to /json/state, not nested in 'state'
-                command = json.dumps({"live": enable}) + "\n"
-                command_bytes = command.encode('utf-8')
-                
-                self._log(f"Sending: {command.strip()}")
-                
-                ser.write(command_bytes)
-                ser.flush()
-                
-                # Wait for acknowledgment
-                time.sleep(0.3)
-                
-                # Some WLED versions may send a response, others may not
-                # We'll verify by querying the state afterwards
-                if ser.in_waiting > 0:
-                    response = ser.read(ser.in_waiting)
-                    self._log(f"Response: {response.decode('utf-8', errors='ignore')}")
-                
-                return True
-                
-        except serial.SerialException as e:
-            print(f"Error: Cannot open serial port {device.port}: {e}")
-            return False
-        except Exception as e:
-            print(f"Error setting LIVE mode: {e}")
-            return False
+            ser = device.port_handle()
+            
+            # Clear stale input
+            ser.reset_input_buffer()
+            
+            # Send LIVE mode change plus verbose state request
+            command = self.CMD_LIVE_VERBOSE[enable]
+            self._log("Sending: %s", command)
+            
+            self._write(ser, command)
+            
+            response, data = self._read_json(ser, self._expected_response_time(device.baud_rate))
+        except (serial.SerialException, OSError) as e:
+            device.close()  # Reopened on next use
+            self._print(f"Error: Cannot open serial port {device.port}: {e}")
+            return None
+        
+        if data is None:
+            self._log("No state in response: %s", response[:100])
+            return None
+        
+        if not isinstance(data, dict) or 'info' not in data or 'state' not in data:
+            self._log("Response is not a WLED state")
+            return None
+        
+        device.state_cache = (time.monotonic(), data)
+        return data['info'].get('live', False)
     
-    def verify_live_mode(self, device: WLEDDevice) -> Optional[bool]:
+    def cached_state(self, device: WLEDDevice) -> Optional[Dict[str, Any]]:
+        """
+        Return the device state from the last query if it is still fresh, else None
+        Setters clear the cache, so a cached state is never older than the last change
+        """
+        if device.state_cache is None:
+            return None
+        timestamp, state = device.state_cache
+        if time.monotonic() - timestamp >= self.STATE_CACHE_TTL:
+            return None
+        return state
+    
+    def verify_live_mode(self, device: WLEDDevice, use_cache: bool = True) -> Optional[bool]:
         """
         Verify current LIVE mode state
+        use_cache: reuse a state queried within STATE_CACHE_TTL instead of asking the device
         Returns True if enabled, False if disabled, None on error
         """
+        state = self.cached_state(device) if use_cache else None
+        if state is not None:
+            return state.get('info', {}).get('live', False)
+        
         # Auto-detect baud rate if not verified
         if not device.baud_rate_verified:
             detected_rate = self.detect_json_api_baud_rate(device)
             if detected_rate and detected_rate != device.baud_rate:
-                print(f"  Note: JSON API detected at {detected_rate} baud (not {device.baud_rate})")
+                self._print(f"  Note: JSON API detected at {detected_rate} baud (not {device.baud_rate})")
                 device.baud_rate = detected_rate
             device.baud_rate_verified = True
         
@@ -283,48 +599,40 @@ class WLEDConfigurator:
         
         return live_mode
     
-    def discover_baud_rates(self, device: WLEDDevice) -> List[int]:
+    def discover_baud_rates(self, device: WLEDDevice, led_count: int = ADA_PROBE_LED_COUNT) -> List[int]:
         """
         Discover which baud rates the device supports for LED data
-        Tests common baud rates used for Adalight/AWA protocols
+        Tests common baud rates used for Adalight/AWA protocols with a led_count LED test frame
         Returns list of working baud rates
         """
-        self._log(f"Discovering supported baud rates on {device.port}")
+        self._log("Discovering supported baud rates on %s", device.port)
         working_rates = []
+        probe_frame = _ada_probe_frame(led_count)
         
         for baud_rate in self.COMMON_BAUD_RATES:
-            self._log(f"Testing baud rate: {baud_rate}")
+            self._log("Testing baud rate: %s", baud_rate)
             
             try:
                 # Try to open port at this baud rate
-                with serial.Serial(device.port, baud_rate, timeout=0.5) as ser:
-                    # Clear buffers
-                    ser.reset_input_buffer()
-                    ser.reset_output_buffer()
-                    
-                    # Send a small Adalight test frame
-                    # 'Ada' + LED count (10) + checksum + 30 bytes of RGB data
-                    led_count = 10
-                    ada_header = bytearray([
-                        0x41, 0x64, 0x61,  # 'Ada' header
-                        (led_count >> 8) & 0xFF,
-                        led_count & 0xFF,
-                        (led_count >> 8) ^ (led_count & 0xFF) ^ 0x55
-                    ])
-                    # Add some dummy RGB data (30 bytes for 10 LEDs)
-                    ada_header.extend([0, 0, 0] * led_count)
-                    
-                    ser.write(bytes(ada_header))
-                    ser.flush()
-                    
-                    time.sleep(0.05)
-                    
-                    # If port opened successfully and accepted data, consider it working
-                    working_rates.append(baud_rate)
-                    self._log(f"  ✓ {baud_rate} baud works")
-                    
-            except (serial.SerialException, OSError) as e:
-                self._log(f"  ✗ {baud_rate} baud failed: {e}")
+                ser = device.port_handle()
+                ser.baudrate = baud_rate
+                
+                # Clear stale input
+                ser.reset_input_buffer()
+                
+                # Send a small Adalight test frame
+                ser.write(probe_frame)
+                ser.flush()
+                
+                time.sleep(0.05)
+                
+                # If port opened successfully and accepted data, consider it working
+                working_rates.append(baud_rate)
+                self._log("  ✓ %s baud works", baud_rate)
+                
+            except (serial.SerialException, OSError, ValueError) as e:
+                device.close()  # Reopened on next use
+                self._log("  ✗ %s baud failed: %s", baud_rate, e)
                 continue
         
         return working_rates
@@ -340,38 +648,36 @@ class WLEDConfigurator:
         Returns True on success, False on failure
         """
         if baud_rate not in self.BAUD_RATE_COMMANDS:
-            print(f"Error: Unsupported baud rate: {baud_rate}")
-            print(f"Supported rates: {', '.join(map(str, self.COMMON_BAUD_RATES))}")
+            self._print(f"Error: Unsupported baud rate: {baud_rate}")
+            self._print(f"Supported rates: {', '.join(map(str, self.COMMON_BAUD_RATES))}")
             return False
         
-        cmd_byte = self.BAUD_RATE_COMMANDS[baud_rate]
-        self._log(f"Setting baud rate to {baud_rate} using command byte 0x{cmd_byte:02X}")
+        self._log("Setting baud rate to %s using command byte 0x%02X", baud_rate, self.BAUD_RATE_COMMANDS[baud_rate])
+        device.state_cache = None
         
         try:
-            with serial.Serial(device.port, device.baud_rate, timeout=1.0) as ser:
-                # Let port settle
-                time.sleep(0.1)
-                
-                # Clear buffers
-                ser.reset_input_buffer()
-                ser.reset_output_buffer()
-                
-                # Send baud rate change command (single byte)
-                ser.write(bytes([cmd_byte]))
-                ser.flush()
-                
-                self._log(f"Baud rate command sent")
-                
-                # Give device time to process
-                time.sleep(0.3)
-                
-                return True
-                
-        except serial.SerialException as e:
-            print(f"Error: Cannot open serial port {device.port}: {e}")
+            ser = device.port_handle()
+            
+            # Clear stale input
+            ser.reset_input_buffer()
+            
+            # Send baud rate change command (single byte)
+            ser.write(self.BAUD_RATE_CMDBYTES[baud_rate])
+            ser.flush()
+            
+            self._log("Baud rate command sent")
+            
+            # Give device time to process
+            time.sleep(0.3)
+            
+            return True
+            
+        except (serial.SerialException, OSError) as e:
+            device.close()  # Reopened on next use
+            self._print(f"Error: Cannot open serial port {device.port}: {e}")
             return False
         except Exception as e:
-            print(f"Error setting baud rate: {e}")
+            self._print(f"Error setting baud rate: {e}")
             return False
     
     def save_settings(self, device: WLEDDevice) -> bool:
@@ -380,39 +686,9 @@ class WLEDConfigurator:
         Sends POST to /save endpoint
         Returns True on success, False on failure
         """
-        self._log(f"Saving settings on {device.port}")
-        
-        try:
-            with serial.Serial(device.port, device.baud_rate, timeout=1.0) as ser:
-                # Let port settle
-                time.sleep(0.1)
-                
-                # Clear buffers
-                ser.reset_input_buffer()
-                ser.reset_output_buffer()
-                
-                # Send save command
-                command = b'/save\n'
-                self._log(f"Sending: {command.decode().strip()}")
-                
-                ser.write(command)
-                ser.flush()
-                
-                # Wait for acknowledgment
-                time.sleep(0.5)
-                
-                if ser.in_waiting > 0:
-                    response = ser.read(ser.in_waiting)
-                    self._log(f"Response: {response.decode('utf-8', errors='ignore')}")
-                
-                return True
-                
-        except serial.SerialException as e:
-            print(f"Error: Cannot open serial port {device.port}: {e}")
-            return False
-        except Exception as e:
-            print(f"Error saving settings: {e}")
-            return False
+        self._log("Saving settings on %s", device.port)
+        # Longer than a plain acknowledgment - the device writes its flash before answering
+        return self._send_command(device, self.CMD_SAVE, 0.5, "saving settings") is not None
     
     def get_realtime_timeout(self, device: WLEDDevice) -> Optional[int]:
         """
@@ -435,115 +711,276 @@ class WLEDConfigurator:
         0 = no timeout (realtime mode stays on indefinitely)
         Returns True on success, False on failure
         """
-        self._log(f"Setting realtime timeout to {timeout_ms}ms on {device.port}")
+        self._log("Setting realtime timeout to %sms on %s", timeout_ms, device.port)
         
-        try:
-            with serial.Serial(device.port, device.baud_rate, timeout=1.0) as ser:
-                # Let port settle
-                time.sleep(0.1)
-                
-                # Clear buffers
-                ser.reset_input_buffer()
-                ser.reset_output_buffer()
-                
-                # Send realtime timeout command
-                # The 'lor' property sets realtime timeout
-                command = json.dumps({"lor": timeout_ms}) + "\n"
-                command_bytes = command.encode('utf-8')
-                
-                self._log(f"Sending: {command.strip()}")
-                
-                ser.write(command_bytes)
-                ser.flush()
-                
-                # Wait for acknowledgment
-                time.sleep(0.3)
-                
-                if ser.in_waiting > 0:
-                    response = ser.read(ser.in_waiting)
-                    self._log(f"Response: {response.decode('utf-8', errors='ignore')}")
-                
-                return True
-                
-        except serial.SerialException as e:
-            print(f"Error: Cannot open serial port {device.port}: {e}")
-            return False
-        except Exception as e:
-            print(f"Error setting realtime timeout: {e}")
-            return False
+        # The 'lor' property sets realtime timeout
+        return self._send_command(device, _json_command({"lor": timeout_ms}),
+                                  self._expected_response_time(device.baud_rate, self.ACK_RESPONSE_BYTES),
+                                  "setting realtime timeout") is not None
     
-    def configure_device(self, device: WLEDDevice, enable_live: bool) -> bool:
+    def configure_device(self, device: WLEDDevice, enable_live: bool, fast: bool = False) -> bool:
         """
         Configure device and verify the change
+        fast: skip the state check before the change - one exchange sets LIVE mode and reads the
+              result back (bulk use, where reporting the previous state isn't worth a round-trip)
         Returns True on success, False on failure
         """
         mode_str = "ENABLED" if enable_live else "DISABLED"
         
-        print(f"\nConfiguring {device}...")
-        print(f"  Target: LIVE mode {mode_str}")
+        self._print(f"\nConfiguring {device}...")
+        self._print(f"  Target: LIVE mode {mode_str}")
+        
+        # A state read moments ago that already matches needs no serial I/O at all
+        state = self.cached_state(device)
+        if state is not None and state.get('info', {}).get('live', False) == enable_live:
+            self._print(f"  ℹ LIVE mode is already {mode_str}")
+            return True
+        
+        if fast:
+            self._print(f"  Setting LIVE mode to {mode_str}...")
+            if self.set_and_verify_live_mode(device, enable_live) == enable_live:
+                self._print(f"  ✓ LIVE mode successfully set to {mode_str}")
+                return True
+            # No usable reply (the JSON API may be on another baud rate) - take the checked path
         
         # Query current state
-        print(f"  Checking current state...")
+        self._print(f"  Checking current state...")
         current_state = self.verify_live_mode(device)
         
         if current_state is None:
-            print(f"  ✗ Failed to query device state")
+            self._print(f"  ✗ Failed to query device state")
             return False
         
-        print(f"  Current LIVE mode: {'ENABLED' if current_state else 'DISABLED'}")
+        self._print(f"  Current LIVE mode: {'ENABLED' if current_state else 'DISABLED'}")
         
         # Check if change is needed
         if current_state == enable_live:
-            print(f"  ℹ LIVE mode is already {mode_str}")
+            self._print(f"  ℹ LIVE mode is already {mode_str}")
             return True
         
-        # Apply change
-        print(f"  Setting LIVE mode to {mode_str}...")
-        if not self.set_live_mode(device, enable_live):
-            print(f"  ✗ Failed to set LIVE mode")
-            return False
-        
-        # Verify change
-        print(f"  Verifying change...")
-        time.sleep(0.5)  # Give device time to apply change
+        # Apply change - the device answers with its new state in the same exchange
+        self._print(f"  Setting LIVE mode to {mode_str}...")
+        new_state = self.set_and_verify_live_mode(device, enable_live)
         
-        new_state = self.verify_live_mode(device)
         if new_state is None:
-            print(f"  ⚠ Could not verify change (device may have rebooted)")
-            return False
+            # No state came back with the change - verify with a separate query
+            self._print(f"  Verifying change...")
+            time.sleep(0.5)  # Give device time to apply change
+            
+            new_state = self.verify_live_mode(device, use_cache=False)
+            if new_state is None:
+                self._print(f"  ⚠ Could not verify change (device may have rebooted)")
+                return False
         
         if new_state == enable_live:
-            print(f"  ✓ LIVE mode successfully set to {mode_str}")
+            self._print(f"  ✓ LIVE mode successfully set to {mode_str}")
             return True
         else:
-            print(f"  ✗ LIVE mode verification failed")
-            print(f"    Expected: {mode_str}")
-            print(f"    Actual: {'ENABLED' if new_state else 'DISABLED'}")
+            self._print(f"  ✗ LIVE mode verification failed")
+            self._print(f"    Expected: {mode_str}")
+            self._print(f"    Actual: {'ENABLED' if new_state else 'DISABLED'}")
             return False
 
 
-def load_config(config_path: str = "config.json") -> Optional[Dict[str, Any]]:
-    """Load configuration file"""
-    # Try multiple locations
-    search_paths = [
+class AsyncWLEDConfigurator:
+    """
+    Configure LIVE mode on many devices from a single event loop using pyserial-asyncio
+    Alternative to WLEDConfigurator.run_parallel() that needs no thread per device
+    """
+    
+    # Bulk LIVE changes on more devices than this use the event loop when pyserial-asyncio is installed
+    AUTO_MIN_DEVICES = 4
+    
+    def __init__(self, configurator: WLEDConfigurator):
+        import asyncio  # Deferred like serial_asyncio - importing asyncio alone takes ~70ms
+        import serial_asyncio  # Optional - only needed for --async, raises ImportError if missing
+        self._asyncio = asyncio
+        self._serial_asyncio = serial_asyncio
+        self.configurator = configurator  # Commands, timeouts and debug setting are shared
+    
+    async def _exchange(self, reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter',
+                        command: bytes, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Send a command and read until its reply holds a complete JSON object or timeout expires
+        Returns the parsed WLED state, or None
+        """
+        writer.write(command)
+        await writer.drain()
+        
+        deadline = time.monotonic() + timeout
+        response = b''
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                chunk = await self._asyncio.wait_for(reader.read(WLEDConfigurator.READ_CHUNK_SIZE), remaining)
+            except self._asyncio.TimeoutError:
+                return None
+            if not chunk:
+                return None  # Port closed
+            response += chunk
+            if b'}' not in chunk:
+                continue
+            try:
+                data = _first_json_object(response)
+            except json.JSONDecodeError:
+                continue  # Incomplete - keep reading
+            if isinstance(data, dict) and 'info' in data and 'state' in data:
+                return data
+            return None
+    
+    async def _open_connection(self, device: WLEDDevice,
+                               baud_rate: int) -> Tuple['asyncio.StreamReader', 'asyncio.StreamWriter']:
+        """
+        Open device.port at baud_rate as a (reader, writer) stream pair
+        Same as serial_asyncio.open_serial_connection(), but the port is opened by
+        WLEDDevice.open_port() so DTR/RTS stay low
+        """
+        loop = self._asyncio.get_running_loop()
+        ser = device.open_port(baud_rate, timeout=0)
+        reader = self._asyncio.StreamReader(loop=loop)
+        protocol = self._asyncio.StreamReaderProtocol(reader, loop=loop)
+        try:
+            transport, _ = await self._serial_asyncio.connection_for_serial(loop, lambda: protocol, ser)
+        except BaseException:
+            ser.close()
+            raise
+        return reader, self._asyncio.StreamWriter(transport, protocol, reader, loop)
+    
+    async def configure_device(self, device: WLEDDevice, enable_live: bool, out: List[str]) -> Optional[bool]:
+        """
+        Async equivalent of WLEDConfigurator.configure_device(), output is appended to out
+        Returns True on success, False on failure, None if the device did not answer at the
+        baud rates tried (it may answer at another one, see detect_json_api_baud_rate)
+        """
+        mode_str = "ENABLED" if enable_live else "DISABLED"
+        out.append(f"\nConfiguring {device}...")
+        out.append(f"  Target: LIVE mode {mode_str}")
+        out.append(f"  Checking current state...")
+        
+        # The JSON API normally answers at the default rate, some devices only at the LED data rate
+        for baud_rate in dict.fromkeys((device.baud_rate, device.led_data_baud_rate)):
+            try:
+                reader, writer = await self._open_connection(device, baud_rate)
+            except (serial.SerialException, OSError) as e:
+                out.append(f"  ✗ Cannot open serial port {device.port}: {e}")
+                return False
+            
+            try:
+                await self._asyncio.sleep(0.2)  # Let port settle - WLED needs time
+                
+                state = await self._exchange(reader, writer, self.configurator.CMD_VERBOSE_QUERY,
+                                             self.configurator._expected_response_time(baud_rate))
+                if state is None:
+                    if self.configurator.debug:
+                        out.append(f"[DEBUG] No state from {device.port} at {baud_rate} baud")
+                    continue
+                device.baud_rate = baud_rate
+                
+                current_state = state.get('info', {}).get('live', False)
+                out.append(f"  Current LIVE mode: {'ENABLED' if current_state else 'DISABLED'}")
+                if current_state == enable_live:
+                    out.append(f"  ℹ LIVE mode is already {mode_str}")
+                    return True
+                
+                out.append(f"  Setting LIVE mode to {mode_str}...")
+                state = await self._exchange(reader, writer, self.configurator.CMD_LIVE_VERBOSE[enable_live],
+                                             self.configurator._expected_response_time(baud_rate))
+                if state is None:
+                    out.append(f"  ⚠ Could not verify change (device may have rebooted)")
+                    return False
+                
+                new_state = state.get('info', {}).get('live', False)
+                if new_state == enable_live:
+                    out.append(f"  ✓ LIVE mode successfully set to {mode_str}")
+                    return True
+                out.append(f"  ✗ LIVE mode verification failed")
+                out.append(f"    Expected: {mode_str}")
+                out.append(f"    Actual: {'ENABLED' if new_state else 'DISABLED'}")
+                return False
+            finally:
+                # Wait for the port to really close - reopening it at the next rate fails on Windows otherwise
+                writer.close()
+                await writer.wait_closed()
+        
+        out.append(f"  ✗ No response at {' or '.join(map(str, dict.fromkeys((device.baud_rate, device.led_data_baud_rate))))} baud")
+        return None
+    
+    async def configure_devices(self, devices: List[WLEDDevice], enable_live: bool) -> List[Optional[bool]]:
+        """
+        Configure all devices concurrently, entries sharing a port one after another
+        Each device's output is printed as one block, in device order
+        Returns the results in device order
+        """
+        outputs = [[] for _ in devices]
+        results: List[Optional[bool]] = [None] * len(devices)
+        groups: Dict[str, List[int]] = {}
+        for i, device in enumerate(devices):
+            groups.setdefault(device.port, []).append(i)
+        
+        async def configure_group(indices):
+            for i in indices:  # Config entries sharing a port take turns, like run_parallel()
+                results[i] = await self.configure_device(devices[i], enable_live, outputs[i])
+        
+        await self._asyncio.gather(*(configure_group(indices) for indices in groups.values()))
+        for out in outputs:
+            for line in out:
+                print(line)
+        return results
+
+
+# Parsed config files keyed by (path, mtime) - a file is only parsed again once it changes
+_config_cache: Dict[Tuple[str, float], Dict[str, Any]] = {}
+
+
+@lru_cache(maxsize=None)
+def _config_search_paths(config_path: str) -> Tuple[str, ...]:
+    """
+    Locations to look for the config file, in order
+    Duplicates are dropped - a relative config_path and its cwd-joined form are the same file
+    """
+    return tuple(dict.fromkeys(os.path.abspath(path) for path in (
         config_path,
         os.path.join(os.getcwd(), config_path),
         os.path.join(os.path.dirname(__file__), "..", config_path),
         os.path.join(os.path.dirname(__file__), config_path)
-    ]
-    
-    for path in search_paths:
-        if os.path.exists(path):
-            try:
-                with open(path, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading config from {path}: {e}")
-                continue
+    )))
+
+
+def load_config(config_path: str = "config.json") -> Optional[Dict[str, Any]]:
+    """
+    Load configuration file
+    The parsed config is cached and shared between calls - treat it as read-only
+    """
+    # Try multiple locations
+    for path in _config_search_paths(config_path):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue  # Not here
+        
+        config = _config_cache.get((path, mtime))
+        if config is not None:
+            return config
+        
+        try:
+            with open(path, 'r') as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"Error loading config from {path}: {e}")
+            continue
+        
+        _config_cache[(path, mtime)] = config
+        return config
     
     return None
 
 
+# Keys that discover.py only writes for WLED outputs
+_WLED_MARKERS = frozenset(('wled_version', 'wled_brand'))
+
+
 def find_wled_devices(config: Dict[str, Any]) -> List[WLEDDevice]:
     """Find all WLED devices in configuration"""
     devices = []
@@ -552,14 +989,9 @@ def find_wled_devices(config: Dict[str, Any]) -> List[WLEDDevice]:
     for output in outputs:
         # Check if this is a WLED device
         device_type = output.get('device_type', '').upper()
-        protocol = output.get('protocol', '').lower()
         
         # WLED devices are marked as device_type="WLED" or have wled_ prefixed keys
-        is_wled = (
-            device_type == 'WLED' or
-            'wled_version' in output or
-            'wled_brand' in output
-        )
+        is_wled = device_type == 'WLED' or not _WLED_MARKERS.isdisjoint(output)
         
         if is_wled:
             devices.append(WLEDDevice(output))
@@ -567,12 +999,117 @@ def find_wled_devices(config: Dict[str, Any]) -> List[WLEDDevice]:
     return devices
 
 
-def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
-    """Interactive device configuration menu"""
+# How often the main menu checks device states while waiting for input, and how old a
+# state may get before it is queried again (seconds)
+_MENU_POLL_INTERVAL = 2.0
+_MENU_STATE_MAX_AGE = 10.0
+
+
+def prompt_with_refresh(prompt: str, refresh: Callable[[], bool], interval: float) -> str:
+    """
+    input() that calls refresh() every interval seconds until the user starts typing
+    refresh returns True if it printed anything, then the prompt is shown again
+    Falls back to plain input() when stdin is not an interactive terminal
+    """
+    if not sys.stdin.isatty():
+        return input(prompt)
+    
+    print(prompt, end='', flush=True)
+    if os.name == 'nt':
+        # No select() on console handles - poll for a first keypress instead
+        import msvcrt
+        deadline = time.monotonic() + interval
+        while not msvcrt.kbhit():
+            if time.monotonic() >= deadline:
+                if refresh():
+                    print(prompt, end='', flush=True)
+                deadline = time.monotonic() + interval
+            time.sleep(0.2)
+        return input()
+    
+    # A canonical tty only reports input once a whole line is entered, and cannot take over
+    # characters already read - so with line buffering off, wait for the first keypress and
+    # then edit the line here
+    import termios
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    attrs = termios.tcgetattr(fd)
+    attrs[3] &= ~(termios.ICANON | termios.ECHO)
+    attrs[6][termios.VMIN] = 1
+    attrs[6][termios.VTIME] = 0
+    erase = {saved[6][termios.VERASE], b'\x7f', b'\b'}
+    line = []
+    try:
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        while not select.select([fd], [], [], interval)[0]:
+            if refresh():
+                print(prompt, end='', flush=True)
+        while True:
+            char = os.read(fd, 1)
+            if char in (b'\n', b'\r') or (not char and line):
+                print()
+                break
+            if char in erase:
+                if line:
+                    line.pop()
+                    print('\b \b', end='', flush=True)
+            elif char == saved[6][termios.VKILL]:
+                print('\b \b' * len(line), end='', flush=True)
+                line.clear()
+            elif char in (saved[6][termios.VEOF], b''):
+                if not line:  # Ctrl-D on an empty line, or the terminal went away
+                    print()
+                    raise EOFError
+            elif b' ' <= char < b'\x7f':
+                line.append(char.decode('ascii'))
+                print(line[-1], end='', flush=True)
+    finally:
+        termios.tcsetattr(fd, termios.TCSANOW, saved)
+    return ''.join(line)
+
+def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator, watch: bool = False):
+    """
+    Interactive device configuration menu
+    With watch, device states are re-queried while the main menu waits - this opens the
+    ports periodically, so leave it off while another program (e.g. the OPC server) uses them
+    """
     if not devices:
         print("No WLED devices found in configuration.")
         return
     
+    # LIVE mode per port, as last queried or set - the menu only queries devices missing here
+    live_states: Dict[str, bool] = {}
+    
+    def release_ports():
+        """Close every port, so other programs (or the OPC server) can open them while the menu waits"""
+        for device in devices:
+            device.close()
+    
+    def ask(prompt: str) -> str:
+        """input() with the ports released while waiting"""
+        release_ports()
+        return input(prompt)
+    
+    def refresh_stale() -> bool:
+        """Re-query known devices whose state has gone stale, report any that changed"""
+        now = time.monotonic()
+        stale = [device for device in devices if device.port in live_states and
+                 (device.state_cache is None or now - device.state_cache[0] > _MENU_STATE_MAX_AGE)]
+        if not stale:
+            return False
+        changed = False
+        states = configurator.run_parallel(configurator.query_device_state, stale, 0, quiet=True)
+        release_ports()
+        for device, state in zip(stale, states):
+            if state is None:
+                continue  # Keep showing the last known state
+            live = state.get('info', {}).get('live', False)
+            if live != live_states[device.port]:
+                live_states[device.port] = live
+                print(f"\n  ℹ {device}: LIVE mode is now {'ENABLED' if live else 'DISABLED'}")
+                changed = True
+        return changed
+    
     while True:
         print("\n" + "=" * 60)
         print("WLED Device Configuration - Interactive Mode")
@@ -580,9 +1117,13 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
         
         print("\nAvailable WLED Devices:")
         has_errors = False
+        # Query the devices not known yet, all at once rather than one port after another
+        unknown = [device for device in devices if device.port not in live_states]
+        for device, state in zip(unknown, configurator.run_parallel(configurator.verify_live_mode, unknown)):
+            if state is not None:
+                live_states[device.port] = state
         for i, device in enumerate(devices, 1):
-            # Query current state
-            state = configurator.verify_live_mode(device)
+            state = live_states.get(device.port)
             if state is None:
                 has_errors = True
                 print(f"  {i}. {device}")
@@ -605,15 +1146,22 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
         print("  [r]    Rescan devices")
         print("  [q]    Quit")
         
-        choice = input("\nEnter choice: ").strip().lower()
+        print()
+        release_ports()
+        if watch:
+            choice = prompt_with_refresh("Enter choice: ", refresh_stale, _MENU_POLL_INTERVAL)
+        else:
+            choice = input("Enter choice: ")
+        choice = choice.strip().lower()
         
         if choice == 'q':
             print("Exiting...")
             break
         
         elif choice == 'r':
-            # Rescan - just continue the loop to re-query devices
+            # Rescan - forget the known states so the loop re-queries every device
             print("\nRescanning devices...")
+            live_states.clear()
             continue
         
         elif choice == 'a':
@@ -623,16 +1171,17 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
             print("  [2] Disable LIVE mode on all")
             print("  [c] Cancel")
             
-            action = input("Enter choice: ").strip()
+            action = ask("Enter choice: ").strip()
             
-            if action == '1':
-                print("\nEnabling LIVE mode on all devices...")
-                for device in devices:
-                    configurator.configure_device(device, enable_live=True)
-            elif action == '2':
-                print("\nDisabling LIVE mode on all devices...")
-                for device in devices:
-                    configurator.configure_device(device, enable_live=False)
+            if action in ('1', '2'):
+                enable_live = action == '1'
+                print(f"\n{'Enabling' if enable_live else 'Disabling'} LIVE mode on all devices...")
+                results = configurator.run_parallel(configurator.configure_device, devices, enable_live, True)
+                for device, ok in zip(devices, results):
+                    if ok:
+                        live_states[device.port] = enable_live
+                    else:
+                        live_states.pop(device.port, None)
         
         else:
             # Try to parse as device number
@@ -654,17 +1203,20 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
                         print("  [6] Save settings to device")
                         print("  [b] Back to device list")
                         
-                        action = input("\nEnter choice: ").strip().lower()
+                        action = ask("\nEnter choice: ").strip().lower()
                         
                         if action == 'b':
                             break  # Return to main menu
-                        elif action == '1':
-                            configurator.configure_device(device, enable_live=True)
-                        elif action == '2':
-                            configurator.configure_device(device, enable_live=False)
+                        elif action in ('1', '2'):
+                            enable_live = action == '1'
+                            if configurator.configure_device(device, enable_live=enable_live):
+                                live_states[device.port] = enable_live
+                            else:
+                                live_states.pop(device.port, None)
                         elif action == '3':
                             state = configurator.query_device_state(device)
                             if state:
+                                live_states[device.port] = state.get('info', {}).get('live', False)
                                 print(f"\nDevice State:")
                                 print(json.dumps(state, indent=2))
                         elif action == '4':
@@ -674,7 +1226,7 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
                                 print(f"  [{i}] {rate}")
                             print(f"  [c] Cancel")
                             
-                            baud_choice = input("\nSelect baud rate: ").strip()
+                            baud_choice = ask("\nSelect baud rate: ").strip()
                             if baud_choice.isdigit():
                                 idx = int(baud_choice) - 1
                                 if 0 <= idx < len(configurator.COMMON_BAUD_RATES):
@@ -708,7 +1260,7 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
                             print(f"  [5] Set custom value")
                             print(f"  [c] Cancel")
                             
-                            timeout_choice = input("\nSelect timeout: ").strip()
+                            timeout_choice = ask("\nSelect timeout: ").strip()
                             new_timeout = None
                             
                             if timeout_choice == '1':
@@ -742,7 +1294,7 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
                             print(f"  - Baud rate")
                             print(f"  - Other device settings")
                             
-                            confirm = input("\nContinue? (y/n): ").strip().lower()
+                            confirm = ask("\nContinue? (y/n): ").strip().lower()
                             if confirm == 'y':
                                 if configurator.save_settings(device):
                                     print(f"✓ Settings saved successfully")
@@ -757,73 +1309,23 @@ def interactive_mode(devices: List[WLEDDevice], configurator: WLEDConfigurator):
                 print("Invalid choice")
 
 
-def main():
-    """Main entry point"""
-    parser = argparse.ArgumentParser(
-        description='Configure WLED devices over serial port',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s --enable-live                      Enable LIVE mode on single device
-  %(prog)s --disable-live                     Disable LIVE mode on single device
-  %(prog)s --port COM4 --enable-live          Enable LIVE on specific port
-  %(prog)s --discover-baud                    Discover supported baud rates
-  %(prog)s --set-baud 2000000                 Set LED data baud rate to 2MB
-  %(prog)s --port COM4 --set-baud 2000000     Set baud rate on specific port
-  %(prog)s --interactive                      Interactive mode (default)
-  %(prog)s --config myconfig.json             Use alternate config file
-        """
-    )
-    
-    parser.add_argument('--config', '-c', default='config.json',
-                        help='Configuration file path (default: config.json)')
-    parser.add_argument('--port', '-p',
-                        help='Serial port name (e.g., COM4, /dev/ttyUSB0)')
-    parser.add_argument('--enable-live', action='store_true',
-                        help='Enable LIVE mode on device(s)')
-    parser.add_argument('--disable-live', action='store_true',
-                        help='Disable LIVE mode on device(s)')
-    parser.add_argument('--discover-baud', action='store_true',
-                        help='Discover supported baud rates for LED data')
-    parser.add_argument('--set-baud', type=int, metavar='RATE',
-                        help='Set LED data baud rate (e.g., 115200, 2000000)')
-    parser.add_argument('--get-timeout', action='store_true',
-                        help='Get current realtime timeout value')
-    parser.add_argument('--set-timeout', type=int, metavar='MS',
-                        help='Set realtime timeout in milliseconds (0 = no timeout)')
-    parser.add_argument('--save', action='store_true',
-                        help='Save settings to device persistent storage')
-    parser.add_argument('--interactive', '-i', action='store_true',
-                        help='Interactive mode (default if no action specified)')
-    parser.add_argument('--debug', '-d', action='store_true',
-                        help='Enable debug output')
-    
-    args = parser.parse_args()
-    
-    # Load configuration
-    config = load_config(args.config)
-    if config is None:
-        print(f"Error: Could not load configuration file: {args.config}")
-        print(f"Please ensure config.json exists in the current directory")
-        return 1
-    
-    # Find WLED devices
-    devices = find_wled_devices(config)
-    
-    if not devices:
-        print("No WLED devices found in configuration.")
-        print("Run discover.py to detect and configure WLED devices.")
-        return 1
-    
-    # Create configurator
-    configurator = WLEDConfigurator(debug=args.debug)
-    
+def filter_by_port(devices: List[WLEDDevice], port: str) -> List[WLEDDevice]:
+    """
+    Devices on the given port - port names compare case-insensitively where the OS does
+    (Windows: COM4 and com4 are the same port)
+    """
+    port = os.path.normcase(port)
+    return [device for device in devices if device.port and os.path.normcase(device.port) == port]
+
+
+def run_action(args: argparse.Namespace, devices: List[WLEDDevice], configurator: WLEDConfigurator) -> int:
+    """Run the action selected on the command line, returns the exit code"""
     # Determine mode
     if args.discover_baud:
         # Baud rate discovery mode
         # Filter devices by port if specified
         if args.port:
-            devices = [d for d in devices if d.port == args.port]
+            devices = filter_by_port(devices, args.port)
             if not devices:
                 print(f"Error: No WLED device found on port {args.port}")
                 return 1
@@ -831,9 +1333,10 @@ Examples:
         print(f"\nDiscovering supported baud rates...")
         print(f"Testing: {', '.join(map(str, configurator.COMMON_BAUD_RATES))}\n")
         
-        for device in devices:
+        # Probe all devices at once - the probes are sleeps and serial writes, which release the GIL
+        results = configurator.run_parallel(configurator.discover_baud_rates, devices)
+        for device, working_rates in zip(devices, results):
             print(f"{device}:")
-            working_rates = configurator.discover_baud_rates(device)
             if working_rates:
                 print(f"  ✓ Supports {len(working_rates)} baud rate(s):")
                 for rate in working_rates:
@@ -856,7 +1359,7 @@ Examples:
         
         # Filter devices by port if specified
         if args.port:
-            devices = [d for d in devices if d.port == args.port]
+            devices = filter_by_port(devices, args.port)
             if not devices:
                 print(f"Error: No WLED device found on port {args.port}")
                 return 1
@@ -865,16 +1368,12 @@ Examples:
             for device in devices:
                 print(f"  - {device}")
         
-        # Set baud rate on devices
+        # Set baud rate on devices - concurrently, each device has its own port
         print(f"\nSetting baud rate to {new_rate}...")
-        success = True
-        for device in devices:
-            print(f"  {device}...", end=" ")
-            if configurator.set_device_baud_rate(device, new_rate):
-                print("✓")
-            else:
-                print("✗")
-                success = False
+        results = configurator.run_parallel(configurator.set_device_baud_rate, devices, new_rate)
+        for device, ok in zip(devices, results):
+            print(f"  {device}... {'✓' if ok else '✗'}")
+        success = all(results)
         
         if success:
             print(f"\n✓ Baud rate set successfully")
@@ -888,14 +1387,14 @@ Examples:
     elif args.get_timeout:
         # Get realtime timeout
         if args.port:
-            devices = [d for d in devices if d.port == args.port]
+            devices = filter_by_port(devices, args.port)
             if not devices:
                 print(f"Error: No WLED device found on port {args.port}")
                 return 1
         
         print(f"\nRealtime Timeout Status:\n")
-        for device in devices:
-            timeout_ms = configurator.get_realtime_timeout(device)
+        timeouts = configurator.run_parallel(configurator.get_realtime_timeout, devices)
+        for device, timeout_ms in zip(devices, timeouts):
             if timeout_ms is not None:
                 if timeout_ms == 0:
                     print(f"{device}: 0ms (no timeout - stays on indefinitely)")
@@ -911,7 +1410,7 @@ Examples:
         timeout_ms = args.set_timeout
         
         if args.port:
-            devices = [d for d in devices if d.port == args.port]
+            devices = filter_by_port(devices, args.port)
             if not devices:
                 print(f"Error: No WLED device found on port {args.port}")
                 return 1
@@ -921,14 +1420,10 @@ Examples:
                 print(f"  - {device}")
         
         print(f"\nSetting realtime timeout to {timeout_ms}ms...")
-        success = True
-        for device in devices:
-            print(f"  {device}...", end=" ")
-            if configurator.set_realtime_timeout(device, timeout_ms):
-                print("✓")
-            else:
-                print("✗")
-                success = False
+        results = configurator.run_parallel(configurator.set_realtime_timeout, devices, timeout_ms)
+        for device, ok in zip(devices, results):
+            print(f"  {device}... {'✓' if ok else '✗'}")
+        success = all(results)
         
         if success:
             print(f"\n✓ Timeout set successfully")
@@ -939,7 +1434,7 @@ Examples:
     elif args.save:
         # Save settings
         if args.port:
-            devices = [d for d in devices if d.port == args.port]
+            devices = filter_by_port(devices, args.port)
             if not devices:
                 print(f"Error: No WLED device found on port {args.port}")
                 return 1
@@ -949,14 +1444,10 @@ Examples:
                 print(f"  - {device}")
         
         print(f"\nSaving settings to device persistent storage...")
-        success = True
-        for device in devices:
-            print(f"  {device}...", end=" ")
-            if configurator.save_settings(device):
-                print("✓")
-            else:
-                print("✗")
-                success = False
+        results = configurator.run_parallel(configurator.save_settings, devices)
+        for device, ok in zip(devices, results):
+            print(f"  {device}... {'✓' if ok else '✗'}")
+        success = all(results)
         
         if success:
             print(f"\n✓ Settings saved successfully")
@@ -970,7 +1461,7 @@ Examples:
         
         # Filter devices by port if specified
         if args.port:
-            devices = [d for d in devices if d.port == args.port]
+            devices = filter_by_port(devices, args.port)
             if not devices:
                 print(f"Error: No WLED device found on port {args.port}")
                 return 1
@@ -979,19 +1470,112 @@ Examples:
             for device in devices:
                 print(f"  - {device}")
         
-        # Configure devices
-        success = True
-        for device in devices:
-            if not configurator.configure_device(device, enable_live):
-                success = False
+        # Configure devices - many at once from one event loop if possible, else one thread each
+        async_configurator = None
+        if args.use_async or len(devices) > AsyncWLEDConfigurator.AUTO_MIN_DEVICES:
+            try:
+                async_configurator = AsyncWLEDConfigurator(configurator)
+            except ImportError:
+                if args.use_async:
+                    print("Error: --async requires pyserial-asyncio (pip install pyserial-asyncio)")
+                    return 1
+        
+        if async_configurator is None:
+            success = all(configurator.run_parallel(configurator.configure_device, devices, enable_live, True))
+            return 0 if success else 1
+        
+        results = async_configurator._asyncio.run(async_configurator.configure_devices(devices, enable_live))
+        success = all(results)
+        
+        # Devices that didn't answer at the likely baud rates get the threaded path with full detection
+        unanswered = [device for device, ok in zip(devices, results) if ok is None]
+        if unanswered:
+            print(f"\nRetrying {len(unanswered)} device(s) with baud rate detection...")
+            retried = configurator.run_parallel(configurator.configure_device, unanswered, enable_live)
+            success = all(ok for ok in results if ok is not None) and all(retried)
         
         return 0 if success else 1
     
     else:
         # Interactive mode (default)
-        interactive_mode(devices, configurator)
+        interactive_mode(devices, configurator, args.watch)
         return 0
 
 
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description='Configure WLED devices over serial port',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --enable-live                      Enable LIVE mode on single device
+  %(prog)s --disable-live                     Disable LIVE mode on single device
+  %(prog)s --port COM4 --enable-live          Enable LIVE on specific port
+  %(prog)s --enable-live --async              Enable LIVE on all devices from one event loop
+  %(prog)s --discover-baud                    Discover supported baud rates
+  %(prog)s --set-baud 2000000                 Set LED data baud rate to 2MB
+  %(prog)s --port COM4 --set-baud 2000000     Set baud rate on specific port
+  %(prog)s --interactive                      Interactive mode (default)
+  %(prog)s --watch                            Interactive mode, refreshing device states
+  %(prog)s --config myconfig.json             Use alternate config file
+        """
+    )
+    
+    parser.add_argument('--config', '-c', default='config.json',
+                        help='Configuration file path (default: config.json)')
+    parser.add_argument('--port', '-p',
+                        help='Serial port name (e.g., COM4, /dev/ttyUSB0)')
+    parser.add_argument('--enable-live', action='store_true',
+                        help='Enable LIVE mode on device(s)')
+    parser.add_argument('--disable-live', action='store_true',
+                        help='Disable LIVE mode on device(s)')
+    parser.add_argument('--discover-baud', action='store_true',
+                        help='Discover supported baud rates for LED data')
+    parser.add_argument('--set-baud', type=int, metavar='RATE',
+                        help='Set LED data baud rate (e.g., 115200, 2000000)')
+    parser.add_argument('--get-timeout', action='store_true',
+                        help='Get current realtime timeout value')
+    parser.add_argument('--set-timeout', type=int, metavar='MS',
+                        help='Set realtime timeout in milliseconds (0 = no timeout)')
+    parser.add_argument('--save', action='store_true',
+                        help='Save settings to device persistent storage')
+    parser.add_argument('--interactive', '-i', action='store_true',
+                        help='Interactive mode (default if no action specified)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Interactive mode: keep re-querying device states while the menu waits')
+    parser.add_argument('--debug', '-d', action='store_true',
+                        help='Enable debug output')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Configure LIVE mode on all devices from one event loop (needs pyserial-asyncio)')
+    
+    args = parser.parse_args()
+    
+    # Load configuration
+    config = load_config(args.config)
+    if config is None:
+        print(f"Error: Could not load configuration file: {args.config}")
+        print(f"Please ensure config.json exists in the current directory")
+        return 1
+    
+    # Find WLED devices
+    devices = find_wled_devices(config)
+    
+    if not devices:
+        print("No WLED devices found in configuration.")
+        print("Run discover.py to detect and configure WLED devices.")
+        return 1
+    
+    # Create configurator
+    configurator = WLEDConfigurator(debug=args.debug)
+    
+    try:
+        return run_action(args, devices, configurator)
+    finally:
+        # Close the serial ports kept open across calls
+        for device in devices:
+            device.close()
+
+
 if __name__ == "__main__":
     sys.exit(main())